@@ -0,0 +1,113 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+
+from mp3_utils import mp3_duration
+
+# Bundle layout: the story MP3 files back to back, then the JSON index, then
+# a fixed-size footer holding the index length and a magic number. Readers
+# find the index from the end of the file, so a remote bundle can be read
+# with two small range requests before fetching any story.
+MAGIC = b'TTSBNDL1'
+FOOTER = struct.Struct('<Q8s')
+SUFFIX = '.bundle'
+
+
+def write_bundle(bundle_path, story_paths):
+    """Pack story MP3 files into one bundle, atomically.
+
+    story_paths maps story number to file path. Each story is stored byte
+    for byte, so a story extracted from the bundle is a complete MP3 file.
+    The output depends only on the stories' contents, so an unchanged
+    bundle is skipped by the Drive sync. Returns the index."""
+    bundle_path = Path(bundle_path)
+    tmp_path = bundle_path.with_name(bundle_path.name + '.tmp')
+    stories = {}
+    offset = 0
+    with open(tmp_path, 'wb') as bundle:
+        for number in sorted(story_paths):
+            file_path = Path(story_paths[number])
+            # Stories are small, so each is read whole to hash and time it
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            bundle.write(data)
+            stories[str(number)] = {
+                'name': file_path.name,
+                'offset': offset,
+                'length': len(data),
+                'duration': round(mp3_duration(data), 3),
+                'sha256': hashlib.sha256(data).hexdigest()
+            }
+            offset += len(data)
+
+        index = {'version': 1, 'stories': stories}
+        encoded = json.dumps(index, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        bundle.write(encoded)
+        bundle.write(FOOTER.pack(len(encoded), MAGIC))
+    os.replace(tmp_path, bundle_path)
+    return index
+
+
+class BundleReader:
+    """Read stories out of a bundle without loading the whole of it.
+
+    read_range(offset, length) returns bytes of the bundle, and size is its
+    total length, so the bundle can be local or e.g. fetched with HTTP range
+    requests. BundleReader.open() reads a local bundle through mmap."""
+
+    def __init__(self, read_range, size):
+        self.read_range = read_range
+        self.size = size
+        self._mapped = None
+
+        if size < FOOTER.size:
+            raise ValueError("Not an audio bundle: file too short")
+        index_length, magic = FOOTER.unpack(read_range(size - FOOTER.size, FOOTER.size))
+        if magic != MAGIC or index_length > size - FOOTER.size:
+            raise ValueError("Not an audio bundle: bad footer")
+        self.index = json.loads(read_range(size - FOOTER.size - index_length, index_length))
+        self.stories = {int(number): entry for number, entry in self.index['stories'].items()}
+
+    @classmethod
+    def open(cls, path):
+        """Open a local bundle through mmap; pages are read only when touched"""
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            reader = cls(lambda offset, length: mapped[offset:offset + length], len(mapped))
+        except Exception:
+            mapped.close()
+            raise
+        reader._mapped = mapped
+        return reader
+
+    def story(self, number, verify=False):
+        """Return the MP3 bytes of a story, optionally checking its hash"""
+        entry = self.stories.get(number)
+        if entry is None:
+            raise KeyError(f"Story {number} is not in the bundle")
+        data = self.read_range(entry['offset'], entry['length'])
+        if verify and hashlib.sha256(data).hexdigest() != entry['sha256']:
+            raise ValueError(f"Story {number} does not match its hash")
+        return data
+
+    def extract(self, number, output_path, verify=True):
+        """Write one story to output_path as a standalone MP3 file"""
+        data = self.story(number, verify)
+        with open(output_path, 'wb') as f:
+            f.write(data)
+        return str(output_path)
+
+    def close(self):
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
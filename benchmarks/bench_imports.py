@@ -0,0 +1,101 @@
+"""Import-time benchmark for the command line entry points.
+
+Imports each entry point module in a fresh interpreter under
+`python -X importtime` and reports its total import time and the heaviest
+modules it pulls in. The ElevenLabs, Google and requests client stacks, and
+asyncio for the sync pipeline, must only be loaded when a run actually needs
+them, so the script exits non-zero if importing an entry point loads one
+of them, or if an entry point takes longer than --budget-ms to import:
+
+    python benchmarks/bench_imports.py
+    python benchmarks/bench_imports.py --budget-ms 150 --runs 5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# Client libraries each entry point must not load when it is imported
+ENTRY_POINTS = {
+    'text_to_speech': ('elevenlabs', 'googleapiclient', 'google_auth_oauthlib', 'google.auth', 'httplib2', 'requests', 'pydantic', 'asyncio'),
+    'google_drive_manager': ('elevenlabs', 'google_auth_oauthlib', 'pydantic', 'asyncio'),
+}
+
+
+def import_profile(module):
+    """Import module in a fresh interpreter; return {module: cumulative microseconds}"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=REPO_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        # Indentation shows nesting; the name itself is what matters here
+        cumulative[name.strip()] = int(cumulative_us)
+    return cumulative
+
+
+def forbidden_imports(profile, forbidden):
+    """Return the imported modules that belong to a forbidden package"""
+    return sorted(
+        name for name in profile
+        if any(name == package or name.startswith(package + '.') for package in forbidden)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure import time of the entry points')
+    parser.add_argument('--runs', type=int, default=3, help='Fresh interpreters per entry point; the median is reported')
+    parser.add_argument('--top', type=int, default=8, help='Heaviest imported modules to list')
+    parser.add_argument('--budget-ms', type=float, help='Fail if an entry point takes longer than this to import')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    args = parser.parse_args()
+
+    results = {}
+    failed = False
+    for module, forbidden in ENTRY_POINTS.items():
+        # The first run warms the bytecode cache, so it is not measured
+        import_profile(module)
+        profiles = [import_profile(module) for _ in range(args.runs)]
+        totals = [profile[module] / 1000 for profile in profiles]
+        median_profile = profiles[totals.index(sorted(totals)[len(totals) // 2])]
+        heaviest = sorted(
+            ((name, us) for name, us in median_profile.items() if name != module and '.' not in name),
+            key=lambda item: -item[1]
+        )[:args.top]
+        loaded = forbidden_imports(median_profile, forbidden)
+        over_budget = args.budget_ms is not None and statistics.median(totals) > args.budget_ms
+        failed = failed or bool(loaded) or over_budget
+        results[module] = {
+            'median_ms': round(statistics.median(totals), 1),
+            'min_ms': round(min(totals), 1),
+            'heaviest_ms': {name: round(us / 1000, 1) for name, us in heaviest},
+            'forbidden_imports': loaded,
+            'over_budget': over_budget
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for module, result in results.items():
+            print(f"{module}: {result['median_ms']} ms median, {result['min_ms']} ms min")
+            for name, ms in result['heaviest_ms'].items():
+                print(f"  {name:<32}{ms:>8.1f} ms")
+            if result['forbidden_imports']:
+                print(f"  FAIL: imports {', '.join(result['forbidden_imports'])}")
+            if result['over_budget']:
+                print(f"  FAIL: over the {args.budget_ms} ms budget")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Microbenchmark of story text normalisation on large synthetic mentor files.
+
+Compares TextNormalizer with the chained str.replace / re.sub cleanup that
+generate_audio used before, on generated stories shaped like the real
+input (literal "\\n\\n" paragraph breaks, a closing question).
+
+    python benchmarks/bench_normalizer.py --stories 20000
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from text_processing import TextNormalizer
+
+WORDS = ('champion legend darkness dawn accolades victories sessions greatness '
+         'spotlight shadows effort commitment training strategy precision system').split()
+
+
+def make_story(rng, paragraphs=6, sentences=6):
+    """Build one line of a mentor file"""
+    parts = []
+    for _ in range(paragraphs):
+        sentence_list = []
+        for _ in range(sentences):
+            words = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 20)))
+            sentence_list.append(words.capitalize() + rng.choice('..!'))
+        parts.append('  '.join(sentence_list))
+    return '\\n\\n'.join(parts) + ' What will you build before dawn?'
+
+
+def legacy_normalize(text):
+    """The cleanup generate_audio performed before TextNormalizer"""
+    question_to_format = None
+    parts = text.split("\\n\\n")
+    if len(parts) > 1:
+        last_part = parts[-1].strip()
+        if "?" in last_part:
+            sentences = re.split(r'(?<=[.!?])\s+', last_part)
+            for sentence in reversed(sentences):
+                if sentence.strip().endswith("?"):
+                    question_to_format = sentence.strip()
+                    break
+
+    text = text.replace("\\n\\n", " ")
+    text = text.replace("\\n", " ")
+    text = text.replace("\n\n", " ")
+    text = text.replace("\n", " ")
+    text = re.sub(r'\s+', ' ', text)
+    text = text.strip()
+
+    if question_to_format and question_to_format in text:
+        text = text.replace(question_to_format, f'; {question_to_format}')
+    return text
+
+
+def timed(label, fn, stories, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(stories)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    megabytes = sum(len(story) for story in stories) / (1024 * 1024)
+    print(f"{label:<16} {best:>8.3f}s {megabytes / best:>10.1f} MB/s")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark story text normalisation')
+    parser.add_argument('--stories', type=int, default=20000, help='Number of synthetic stories')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per implementation (best is reported)')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    stories = [make_story(rng) for _ in range(args.stories)]
+    normalizer = TextNormalizer()
+
+    # Both implementations must agree on the synthetic input
+    for story in stories[:100]:
+        assert normalizer.normalize(story).text == legacy_normalize(story)
+
+    print(f"{len(stories)} stories, {sum(len(s) for s in stories) / (1024 * 1024):.1f} MB")
+    legacy = timed('legacy', lambda items: [legacy_normalize(item) for item in items], stories, args.repeat)
+    current = timed('TextNormalizer', normalizer.normalize_lines, stories, args.repeat)
+    print(f"speedup: {legacy / current:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
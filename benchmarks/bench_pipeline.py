@@ -0,0 +1,241 @@
+"""End-to-end pipeline benchmark against local fake ElevenLabs and Drive APIs.
+
+Runs process_text_file on synthetic 1, 10 and 1000 story files, with
+synthesis going to FakeTTSServer and uploads to FakeDriveServer (see
+fake_services.py), so it needs no network, API key or Drive credentials.
+Each scenario runs in its own subprocess against fresh servers and reports
+throughput, p50/p99 per-story latency and peak RSS. The report is saved as
+JSON tagged with the git commit, so runs on different commits can be
+compared:
+
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --stories 1000 --throttle-rate 0.05 --compare benchmarks/results/pipeline-<commit>.json
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+from fake_services import FakeDriveServer, FakeTTSServer
+
+WORDS = ('champion legend darkness dawn accolades victories sessions greatness '
+         'spotlight shadows effort commitment training strategy precision system').split()
+
+
+def make_story(rng, chars):
+    """Build one line of a mentor file of about chars characters"""
+    words = []
+    length = 0
+    while length < chars:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    middle = len(words) // 2
+    return ' '.join(words[:middle]) + '.\\n\\n' + ' '.join(words[middle:]) + '. What will you build?'
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))]
+
+
+def git_revision():
+    """Return (short commit, dirty flag) of the benchmarked tree"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, check=True, capture_output=True, text=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_DIR, check=True, capture_output=True, text=True).stdout
+        return commit, bool(status.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+
+
+def run_scenario(config):
+    """Child process: run one scenario and print its measurements as JSON"""
+    os.environ.setdefault('ELEVEN_LABS_API_KEY', 'benchmark')
+    os.chdir(tempfile.mkdtemp(prefix='bench_pipeline_'))
+    from google.auth.credentials import AnonymousCredentials
+    from google_drive_manager import GoogleDriveManager
+    from metrics import Metrics
+    from text_to_speech import ElevenLabsManager
+
+    rng = random.Random(config['seed'])
+    with open('bench.txt', 'w', encoding='utf-8') as f:
+        for _ in range(config['stories']):
+            f.write(make_story(rng, config['story_chars']) + '\n')
+
+    metrics = Metrics(events_path='events.jsonl')
+    manager = ElevenLabsManager(
+        api_base_url=config['tts_url'],
+        max_in_flight=config['workers'],
+        cache_dir=None,
+        voices_cache_path=None,
+        pool_size=max(config['workers'] * 4, 10),
+        metrics=metrics
+    )
+    if config['drive_url']:
+        drive_manager = GoogleDriveManager(api_endpoint=config['drive_url'], sessions_path=None, folder_cache_path=None)
+        drive_manager.creds = AnonymousCredentials()
+        drive_manager.service = drive_manager._build_service()
+        manager.drive_manager = drive_manager
+
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        files = manager.process_text_file(
+            'bench.txt',
+            voice_id='benchmarkvoice000001',
+            upload_to_drive=bool(config['drive_url']),
+            workers=config['workers'],
+            upload_workers=config['upload_workers'],
+            bundle=config['bundle']
+        )
+    elapsed = time.perf_counter() - start
+    metrics.close()
+
+    story_seconds = []
+    with open('events.jsonl', encoding='utf-8') as f:
+        for line in f:
+            event = json.loads(line)
+            if event.get('stage') == 'story':
+                story_seconds.append(event['seconds'])
+
+    print(json.dumps({
+        'stories': config['stories'],
+        'generated': len(files),
+        'seconds': round(elapsed, 3),
+        'stories_per_s': round(len(files) / elapsed, 2),
+        'p50_s': round(percentile(story_seconds, 0.50), 3),
+        'p99_s': round(percentile(story_seconds, 0.99), 3),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'retries': manager.retries,
+        'throttled': manager.throttled,
+        'bytes_written': metrics.counters.get('bytes_written', 0),
+        'bytes_uploaded': metrics.counters.get('bytes_uploaded', 0),
+        'stage_seconds': {stage: round(histogram.sum, 3) for stage, histogram in metrics.histograms.items()}
+    }))
+
+
+def print_report(report, baseline=None):
+    previous = {scenario['stories']: scenario for scenario in (baseline or {}).get('scenarios', [])}
+    header = f"{'stories':>8} {'time (s)':>9} {'stories/s':>10} {'p50 (s)':>8} {'p99 (s)':>8} {'peak RSS (MB)':>14} {'retries':>8} {'Drive calls':>12}"
+    if baseline:
+        print(f"Comparing {report['commit']} against {baseline['commit']}")
+        header += f" {'stories/s vs base':>18}"
+    print(header)
+    for scenario in report['scenarios']:
+        row = (f"{scenario['stories']:>8} {scenario['seconds']:>9} {scenario['stories_per_s']:>10} {scenario['p50_s']:>8} "
+               f"{scenario['p99_s']:>8} {scenario['peak_rss_mb']:>14} {scenario['retries']:>8} {scenario.get('drive_calls', '-'):>12}")
+        base = previous.get(scenario['stories'])
+        if base and base['stories_per_s']:
+            row += f" {(scenario['stories_per_s'] / base['stories_per_s'] - 1) * 100:>+17.1f}%"
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the synthesis and upload pipeline offline')
+    parser.add_argument('--stories', default='1,10,1000', help='Comma-separated story counts, one scenario each')
+    parser.add_argument('--workers', type=int, default=8, help='Synthesis workers')
+    parser.add_argument('--upload-workers', type=int, default=4, help='Upload workers')
+    parser.add_argument('--no-upload', action='store_true', help='Benchmark synthesis only')
+    parser.add_argument('--bundle', action='store_true', help='Upload one bundle per file instead of every story')
+    parser.add_argument('--story-chars', type=int, default=200, help='Approximate characters per story')
+    parser.add_argument('--latency', type=float, default=0.1, help='Fake TTS latency per request in seconds')
+    parser.add_argument('--jitter', type=float, default=0.05, help='Random extra TTS latency, up to this many seconds')
+    parser.add_argument('--throughput-mb', type=float, default=2.0, help='Fake TTS response throughput in MB/s per request')
+    parser.add_argument('--error-rate', type=float, default=0.01, help='Fraction of TTS requests failing with HTTP 500')
+    parser.add_argument('--throttle-rate', type=float, default=0.02, help='Fraction of TTS requests rejected with HTTP 429')
+    parser.add_argument('--retry-after', type=float, default=0.5, help='Retry-After sent with 429 responses')
+    parser.add_argument('--drive-latency', type=float, default=0.02, help='Fake Drive latency per call in seconds')
+    parser.add_argument('--drive-throughput-mb', type=float, default=10.0, help='Fake Drive upload throughput in MB/s per upload')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Report path (default benchmarks/results/pipeline-<commit>.json)')
+    parser.add_argument('--compare', help='Earlier report to compare throughput against')
+    parser.add_argument('--scenario', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        run_scenario(json.loads(args.scenario))
+        return
+
+    commit, dirty = git_revision()
+    config = {
+        'workers': args.workers,
+        'upload_workers': args.upload_workers,
+        'upload': not args.no_upload,
+        'bundle': args.bundle,
+        'story_chars': args.story_chars,
+        'latency': args.latency,
+        'jitter': args.jitter,
+        'throughput_mb': args.throughput_mb,
+        'error_rate': args.error_rate,
+        'throttle_rate': args.throttle_rate,
+        'retry_after': args.retry_after,
+        'drive_latency': args.drive_latency,
+        'drive_throughput_mb': args.drive_throughput_mb,
+        'seed': args.seed
+    }
+    report = {
+        'commit': commit + ('-dirty' if dirty else ''),
+        'date': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': config,
+        'scenarios': []
+    }
+
+    for stories in [int(count) for count in args.stories.split(',')]:
+        # Fresh servers per scenario: an empty Drive and the same TTS outcomes
+        tts = FakeTTSServer(
+            latency=args.latency,
+            jitter=args.jitter,
+            throughput=args.throughput_mb * 1024 * 1024,
+            error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate,
+            retry_after=args.retry_after,
+            seed=args.seed
+        )
+        drive = FakeDriveServer(latency=args.drive_latency, throughput=args.drive_throughput_mb * 1024 * 1024)
+        with tts, drive:
+            scenario = dict(
+                config,
+                stories=stories,
+                tts_url=tts.url,
+                drive_url=None if args.no_upload else drive.url
+            )
+            output = subprocess.run(
+                [sys.executable, __file__, '--scenario', json.dumps(scenario)],
+                check=True, capture_output=True, text=True
+            ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        result['drive_calls'] = drive.calls
+        report['scenarios'].append(result)
+
+    output_path = Path(args.output) if args.output else REPO_DIR / 'benchmarks' / 'results' / f"pipeline-{report['commit']}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    print(f"Report saved to {output_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark the post-processing stage on a corpus of generated test tones.
+
+Writes WAV files of sine tones at random levels, padded with low-level
+noise before and after, then trims and normalises them with PostProcessor
+at each process count. Reports wall time, total and per-file CPU time,
+audio processed per second and the spread of loudness before and after.
+Needs NumPy; --mp3 also needs ffmpeg.
+
+    python benchmarks/bench_post_processing.py --files 200 --processes 1,4
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from post_processing import PostProcessor, read_audio, rms_dbfs, write_audio
+
+SAMPLE_RATE = 44100
+
+
+def noise(rng, seconds):
+    """A noise floor well under the silence threshold, as in real recordings"""
+    return rng.normal(0, 10 ** (-70 / 20), int(seconds * SAMPLE_RATE))
+
+
+def make_corpus(directory, files, seed, audio_format='wav'):
+    """Write test tones; returns (total audio seconds, RMS levels in dBFS)"""
+    rng = np.random.default_rng(seed)
+    total_seconds = 0.0
+    levels = []
+    for index in range(1, files + 1):
+        tone_seconds = rng.uniform(3, 10)
+        lead, tail = rng.uniform(0.2, 1.5, size=2)
+        level_db = rng.uniform(-35, -6)
+        t = np.arange(int(tone_seconds * SAMPLE_RATE)) / SAMPLE_RATE
+        tone = np.sin(2 * np.pi * rng.uniform(200, 1000) * t) * 10 ** (level_db / 20) * np.sqrt(2)
+        samples = np.concatenate([noise(rng, lead), tone, noise(rng, tail)]).astype(np.float32).reshape(-1, 1)
+        write_audio(Path(directory) / f"tone_{index:03d}.{audio_format}", samples, SAMPLE_RATE)
+        total_seconds += len(samples) / SAMPLE_RATE
+        levels.append(rms_dbfs(samples))
+    return total_seconds, levels
+
+
+def run(corpus_dir, work_dir, processes):
+    """Post-process a fresh copy of the corpus; returns its measurements"""
+    shutil.rmtree(work_dir, ignore_errors=True)
+    shutil.copytree(corpus_dir, work_dir)
+    paths = sorted(Path(work_dir).iterdir())
+
+    processor = PostProcessor(workers=processes)
+    # Start the workers before timing, as a long pipeline run would have
+    processor.submit(paths[0]).result()
+    shutil.copy(Path(corpus_dir) / paths[0].name, paths[0])
+
+    started = time.perf_counter()
+    futures = [processor.submit(path) for path in paths]
+    results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - started
+    processor.close()
+
+    cpu = [result['cpu_seconds'] for result in results]
+    return {
+        'seconds': elapsed,
+        'cpu_seconds': sum(cpu),
+        'cpu_mean_ms': statistics.mean(cpu) * 1000,
+        'cpu_p95_ms': sorted(cpu)[int(0.95 * (len(cpu) - 1))] * 1000,
+        'trimmed_seconds': sum(result['trimmed'] for result in results),
+        'levels': [rms_dbfs(read_audio(path)[0]) for path in paths]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark silence trimming and loudness normalisation')
+    parser.add_argument('--files', type=int, default=100, help='Test tones in the corpus')
+    parser.add_argument('--processes', default=f"1,{os.cpu_count() or 1}", help='Comma-separated process counts to compare')
+    parser.add_argument('--mp3', action='store_true', help='Encode the corpus as MP3 (requires ffmpeg)')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.mp3 and not shutil.which('ffmpeg'):
+        parser.error('--mp3 requires ffmpeg on the PATH')
+
+    with tempfile.TemporaryDirectory(prefix='bench_post_') as tmp:
+        corpus_dir = Path(tmp) / 'corpus'
+        corpus_dir.mkdir()
+        audio_seconds, levels = make_corpus(corpus_dir, args.files, args.seed, 'mp3' if args.mp3 else 'wav')
+        print(f"Corpus: {args.files} files, {audio_seconds:.0f}s of audio, "
+              f"loudness {min(levels):.1f} to {max(levels):.1f} dBFS (stdev {statistics.pstdev(levels):.1f} dB)")
+
+        print(f"{'processes':>9} {'time (s)':>9} {'audio s/s':>10} {'CPU (s)':>8} {'CPU/file ms':>12} {'p95 ms':>8} {'trimmed s':>10} {'loudness stdev':>15}")
+        for processes in dict.fromkeys(int(count) for count in args.processes.split(',')):
+            result = run(corpus_dir, Path(tmp) / 'work', processes)
+            print(f"{processes:>9} {result['seconds']:>9.2f} {audio_seconds / result['seconds']:>10.0f} {result['cpu_seconds']:>8.2f} "
+                  f"{result['cpu_mean_ms']:>12.1f} {result['cpu_p95_ms']:>8.1f} {result['trimmed_seconds']:>10.1f} "
+                  f"{statistics.pstdev(result['levels']):>12.2f} dB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Compare buffered and streamed synthesis: peak RSS and time to first byte.
+
+Runs ElevenLabsManager.generate_audio against a stub that produces audio at a
+fixed throughput, so no API calls are made. Each mode runs in its own
+subprocess so peak RSS measurements do not interfere.
+
+    python benchmarks/bench_streaming.py --audio-mb 32
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def run_mode(mode, audio_mb, chunk_kb, throughput_mb):
+    """Synthesize one story in the given mode and print measurements as JSON"""
+    os.environ.setdefault('ELEVEN_LABS_API_KEY', 'benchmark')
+    os.chdir(tempfile.mkdtemp(prefix='bench_streaming_'))
+    from text_to_speech import ElevenLabsManager
+
+    total_bytes = audio_mb * 1024 * 1024
+    chunk_size = chunk_kb * 1024
+    delay = chunk_size / (throughput_mb * 1024 * 1024)
+    timings = {}
+
+    def fake_generate(text, voice, model, stream=False, stream_chunk_size=chunk_size):
+        def chunks(record_first_byte):
+            sent = 0
+            while sent < total_bytes:
+                time.sleep(delay)
+                size = min(stream_chunk_size, total_bytes - sent)
+                sent += size
+                if record_first_byte:
+                    # The chunk is written immediately after it is yielded
+                    timings.setdefault('first_byte', time.perf_counter())
+                yield b'\xff' * size
+        if stream:
+            return chunks(True)
+        return b''.join(chunks(False))
+
+    def timed_save(audio, path):
+        timings.setdefault('first_byte', time.perf_counter())
+        with open(path, 'wb') as f:
+            f.write(audio)
+
+    manager = ElevenLabsManager(generate_fn=fake_generate, save_fn=timed_save, cache_dir=None, voices_cache_path=None)
+    start = time.perf_counter()
+    manager.generate_audio('benchmark', voice_id='benchmark', stream=(mode == 'stream'), stream_chunk_size=chunk_size)
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        'mode': mode,
+        'total_s': round(elapsed, 3),
+        'time_to_first_byte_s': round(timings['first_byte'] - start, 3),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark buffered vs streamed synthesis')
+    parser.add_argument('--audio-mb', type=int, default=32, help='Size of the synthesized audio in MB')
+    parser.add_argument('--chunk-kb', type=int, default=16, help='Stream chunk size in KB')
+    parser.add_argument('--throughput-mb', type=float, default=64.0, help='Simulated API throughput in MB/s')
+    parser.add_argument('--mode', choices=['buffered', 'stream'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.audio_mb, args.chunk_kb, args.throughput_mb)
+        return
+
+    print(f"{'mode':<10} {'total (s)':>10} {'TTFB (s)':>10} {'peak RSS (MB)':>14}")
+    for mode in ('buffered', 'stream'):
+        output = subprocess.run(
+            [sys.executable, __file__, '--mode', mode,
+             '--audio-mb', str(args.audio_mb),
+             '--chunk-kb', str(args.chunk_kb),
+             '--throughput-mb', str(args.throughput_mb)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{result['mode']:<10} {result['total_s']:>10} {result['time_to_first_byte_s']:>10} {result['peak_rss_mb']:>14}")
+
+
+if __name__ == '__main__':
+    main()
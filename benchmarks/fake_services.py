@@ -0,0 +1,394 @@
+"""Local stand-ins for the ElevenLabs and Google Drive APIs.
+
+Both servers speak enough of the real HTTP APIs for ElevenLabsManager and
+GoogleDriveManager to run unchanged against them (via api_base_url and
+api_endpoint), so benchmarks need no network, credentials or quota.
+
+    with FakeTTSServer(latency=0.1, throttle_rate=0.02) as tts, FakeDriveServer() as drive:
+        manager = ElevenLabsManager(api_base_url=tts.url, ...)
+        drive_manager = GoogleDriveManager(api_endpoint=drive.url, ...)
+"""
+import hashlib
+import json
+import math
+import random
+import re
+import socket
+import struct
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# One MPEG-1 Layer III frame: 128 kbps, 44.1 kHz, no padding -> 417 bytes, 1152 samples
+MP3_FRAME = b'\xff\xfb\x90\x64' + bytes(417 - 4)
+MP3_FRAME_SECONDS = 1152 / 44100
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+
+def fake_mp3(seconds):
+    """Return a valid (silent) MP3 stream of about the given duration"""
+    return MP3_FRAME * max(1, math.ceil(seconds / MP3_FRAME_SECONDS))
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Many concurrent workers connect at once
+    request_queue_size = 128
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, like the real APIs
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _send(self, status, body=b'', headers=None, content_type='application/json'):
+        if body is None:
+            body = b''
+        elif isinstance(body, (dict, list)):
+            body = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if body or status not in (204, 308):
+            self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+class _BackgroundServer:
+    """Run a handler class on a free localhost port in a daemon thread"""
+
+    handler_class = None
+
+    def start(self):
+        handler = type('Handler', (self.handler_class,), {'fake': self})
+        self.server = _Server(('127.0.0.1', 0), handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    @property
+    def address(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+        return False
+
+
+class _TTSHandler(_Handler):
+    def do_GET(self):
+        if urlsplit(self.path).path == '/v1/voices':
+            self._send(200, {'voices': [
+                {'voice_id': 'benchmarkvoice000001', 'name': 'Benchmark', 'category': 'premade', 'description': 'Fake voice'}
+            ]})
+        else:
+            self._send(404, {'detail': 'not found'})
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        body = self._body()
+        if not path.startswith('/v1/text-to-speech/'):
+            self._send(404, {'detail': 'not found'})
+            return
+
+        fake = self.fake
+        outcome = fake.next_outcome()
+        time.sleep(fake.latency + fake.jitter())
+        if outcome == 429:
+            self._send(429, {'detail': 'too_many_concurrent_requests'}, {'Retry-After': str(fake.retry_after)})
+            return
+        if outcome not in (200, 'truncated'):
+            self._send(outcome, {'detail': 'internal error' if outcome == 500 else 'request failed'})
+            return
+
+        text = json.loads(body).get('text', '')
+        audio = fake_mp3(len(text) * fake.seconds_per_char)
+        with fake.lock:
+            fake.requests += 1
+            fake.characters += len(text)
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'audio/mpeg')
+        self.send_header('Content-Length', str(len(audio)))
+        self.send_header('character-cost', str(len(text)))
+        self.end_headers()
+        if outcome == 'truncated':
+            # Lose the connection halfway through the body
+            audio = audio[:len(audio) // 2]
+            self.close_connection = True
+        # Pace the body to the configured throughput
+        chunk_size = 16 * 1024
+        for start in range(0, len(audio), chunk_size):
+            chunk = audio[start:start + chunk_size]
+            if fake.throughput:
+                time.sleep(len(chunk) / fake.throughput)
+            self.wfile.write(chunk)
+
+
+class FakeTTSServer(_BackgroundServer):
+    """Fake ElevenLabs API: /v1/voices and /v1/text-to-speech/<voice>[/stream].
+
+    Each synthesis request waits latency (plus up to jitter) seconds, then
+    fails with 429 (with Retry-After) at throttle_rate, with 500 at
+    error_rate, or returns silent MP3 frames whose duration is proportional
+    to the text length, sent at throughput bytes per second. Outcomes come
+    from a seeded generator, so runs are repeatable. next_outcome() may
+    also return 'truncated', which cuts the audio off halfway."""
+
+    handler_class = _TTSHandler
+
+    def __init__(self, latency=0.1, jitter=0.05, throughput=2 * 1024 * 1024, error_rate=0.0, throttle_rate=0.0, retry_after=0.5, seconds_per_char=1 / 15, seed=0):
+        self.latency = latency
+        self.jitter_max = jitter
+        self.throughput = throughput
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.seconds_per_char = seconds_per_char
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.characters = 0
+
+    @property
+    def url(self):
+        return f"{self.address}/v1"
+
+    def jitter(self):
+        with self.lock:
+            return self.random.uniform(0, self.jitter_max)
+
+    def next_outcome(self):
+        with self.lock:
+            roll = self.random.random()
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return 500
+        return 200
+
+
+class _DriveHandler(_Handler):
+    def do_GET(self):
+        self._dispatch('GET', self.path, self._body())
+
+    def do_POST(self):
+        self._dispatch('POST', self.path, self._body())
+
+    def do_PATCH(self):
+        self._dispatch('PATCH', self.path, self._body())
+
+    def do_PUT(self):
+        self._dispatch('PUT', self.path, self._body())
+
+    def do_DELETE(self):
+        self._dispatch('DELETE', self.path, self._body())
+
+    def _dispatch(self, method, path, body):
+        if urlsplit(path).path == '/batch/drive/v3':
+            self._batch(body)
+            return
+        status, payload, headers = self.fake.handle(method, path, self.headers, body, self.headers.get('Host'))
+        if status is None:
+            # Dropped: reset the connection (RST, not FIN) without answering
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+            self.connection.close()
+            self.close_connection = True
+            return
+        self._send(status, payload, headers)
+
+    def _batch(self, body):
+        """Answer a multipart/mixed batch by running each part through handle()"""
+        boundary = re.search(r'boundary="?([^";]+)"?', self.headers.get('Content-Type', '')).group(1)
+        responses = []
+        for part in body.split(f"--{boundary}".encode())[1:]:
+            if part.startswith(b'--'):
+                break
+            # Each part is MIME headers, then an embedded HTTP request
+            outer_headers, inner = re.split(rb'\r?\n\r?\n', part.lstrip(b'\r\n'), maxsplit=1)
+            content_id = re.search(rb'Content-ID: <([^>]+)>', outer_headers).group(1).decode()
+            request_head, inner_body = re.split(rb'\r?\n\r?\n', inner, maxsplit=1)
+            method, inner_path, _ = request_head.splitlines()[0].decode().split(' ', 2)
+            status, payload, _ = self.fake.handle(method, inner_path, {}, inner_body.strip(), None)
+            responses.append(
+                f"Content-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} OK\r\nContent-Type: application/json\r\n\r\n{json.dumps(payload or {})}\r\n"
+            )
+        out_boundary = f"batch_{uuid.uuid4().hex}"
+        output = ''.join(f"--{out_boundary}\r\n{response}" for response in responses) + f"--{out_boundary}--\r\n"
+        self._send(200, output.encode('utf-8'), content_type=f'multipart/mixed; boundary={out_boundary}')
+
+
+class FakeDriveServer(_BackgroundServer):
+    """Fake Google Drive v3 API, kept in memory.
+
+    Supports what GoogleDriveManager uses: files.list (q on name, mimeType,
+    parent; paginated), files.create/update/delete, resumable media uploads
+    in chunks, and HTTP batch requests. Uploaded content is not stored, only
+    its size and MD5, so large runs stay cheap. Every call waits latency
+    seconds and uploads are paced to throughput bytes per second. Set
+    drop_chunks to cut that many upload chunks off halfway by resetting the
+    connection, and call
+    expire_sessions() to make open upload sessions answer 410 Gone."""
+
+    handler_class = _DriveHandler
+
+    def __init__(self, latency=0.02, throughput=10 * 1024 * 1024):
+        self.latency = latency
+        self.throughput = throughput
+        self.lock = threading.Lock()
+        self.files = {}
+        self.sessions = {}
+        self.calls = 0
+        self.bytes_received = 0
+        self.drop_chunks = 0
+
+    @property
+    def url(self):
+        return f"{self.address}/drive/v3/"
+
+    def expire_sessions(self):
+        with self.lock:
+            for session in self.sessions.values():
+                session['expired'] = True
+
+    def _new_file(self, metadata):
+        file_id = uuid.uuid4().hex
+        self.files[file_id] = {
+            'id': file_id,
+            'name': metadata.get('name'),
+            'mimeType': metadata.get('mimeType', 'application/octet-stream'),
+            'parents': metadata.get('parents', []),
+            'trashed': False
+        }
+        return self.files[file_id]
+
+    def _list(self, params):
+        query = params.get('q', [''])[0]
+        name = re.search(r"name='([^']*)'", query)
+        mime_type = re.search(r"mimeType='([^']*)'", query)
+        parent = re.search(r"'([^']*)' in parents", query)
+        matches = [
+            entry for entry in self.files.values()
+            if not entry['trashed']
+            and (not name or entry['name'] == name.group(1))
+            and (not mime_type or entry['mimeType'] == mime_type.group(1))
+            and (not parent or parent.group(1) in entry['parents'])
+        ]
+        page_size = int(params.get('pageSize', ['100'])[0])
+        offset = int(params.get('pageToken', ['0'])[0])
+        result = {'files': matches[offset:offset + page_size]}
+        if offset + page_size < len(matches):
+            result['nextPageToken'] = str(offset + page_size)
+        return result
+
+    def handle(self, method, path, headers, body, host):
+        """Serve one API call; returns (status, json payload, headers)"""
+        parts = urlsplit(path)
+        params = parse_qs(parts.query)
+        route = parts.path
+        time.sleep(self.latency)
+        if route.startswith('/upload/sessions/') and self.throughput:
+            # Pace each upload connection to the configured bandwidth
+            time.sleep(len(body) / self.throughput)
+        with self.lock:
+            self.calls += 1
+
+            if route.startswith('/upload/sessions/'):
+                return self._upload_chunk(route.rsplit('/', 1)[1], headers, body)
+
+            upload = route.startswith('/upload/drive/v3/files')
+            match = re.fullmatch(r'/(?:upload/)?drive/v3/files(?:/([^/]+))?', route)
+            if not match:
+                return 404, {'error': {'code': 404, 'message': 'not found'}}, None
+            file_id = match.group(1)
+            metadata = json.loads(body) if body.strip() else {}
+            if not file_id and method == 'POST' and any(parent not in self.files and parent != 'root' for parent in metadata.get('parents', [])):
+                # Drive rejects new files in a folder that no longer exists
+                return 404, {'error': {'code': 404, 'message': 'File not found'}}, None
+
+            if upload:
+                # Start a resumable session; chunks are PUT to its Location
+                if file_id and file_id not in self.files:
+                    return 404, {'error': {'code': 404, 'message': 'File not found'}}, None
+                session_id = uuid.uuid4().hex
+                self.sessions[session_id] = {'file_id': file_id, 'metadata': metadata, 'received': 0, 'md5': hashlib.md5()}
+                return 200, None, {'Location': f"http://{host}/upload/sessions/{session_id}"}
+
+            if method == 'GET' and not file_id:
+                return 200, self._list(params), None
+            if method == 'POST' and not file_id:
+                return 200, self._new_file(metadata), None
+            if file_id not in self.files:
+                return 404, {'error': {'code': 404, 'message': 'File not found'}}, None
+            if method == 'GET':
+                return 200, self.files[file_id], None
+            if method == 'PATCH':
+                self.files[file_id].update({key: value for key, value in metadata.items() if key in ('name', 'trashed')})
+                return 200, self.files[file_id], None
+            if method == 'DELETE':
+                del self.files[file_id]
+                return 204, None, None
+            return 405, {'error': {'code': 405, 'message': 'method not allowed'}}, None
+
+    def _upload_chunk(self, session_id, headers, body):
+        """Accept one chunk of a resumable upload (or a status query)"""
+        session = self.sessions.get(session_id)
+        if not session:
+            return 404, {'error': {'code': 404, 'message': 'Upload session not found'}}, None
+        if session.get('expired'):
+            return 410, {'error': {'code': 410, 'message': 'Upload session expired'}}, None
+        if 'file' in session:
+            # Already complete: a status query gets the file resource again
+            return 200, session['file'], None
+        match = re.match(r'bytes (\*|(\d+)-(\d+))/(\d+|\*)', headers.get('Content-Range', ''))
+        total = match.group(4) if match else '*'
+        if match and match.group(1) != '*':
+            start = int(match.group(2))
+            if start != session['received']:
+                # Out-of-order chunk: report what we have so the client resends
+                return 308, None, self._range_header(session)
+            if body and self.drop_chunks:
+                # Keep the first half of the chunk, then reset the connection
+                self.drop_chunks -= 1
+                body = body[:len(body) // 2]
+                session['received'] += len(body)
+                session['md5'].update(body)
+                self.bytes_received += len(body)
+                return None, None, None
+            session['received'] += len(body)
+            session['md5'].update(body)
+            self.bytes_received += len(body)
+        if total == '*' or session['received'] < int(total):
+            return 308, None, self._range_header(session)
+
+        # Upload complete
+        entry = self.files.get(session['file_id']) or self._new_file(session['metadata'])
+        entry['md5Checksum'] = session['md5'].hexdigest()
+        entry['size'] = str(session['received'])
+        session['file'] = entry
+        return 200, entry, None
+
+    @staticmethod
+    def _range_header(session):
+        return {'Range': f"bytes=0-{session['received'] - 1}"} if session['received'] else {}
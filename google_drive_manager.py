@@ -1,26 +1,94 @@
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient import discovery_cache
+from googleapiclient.http import BatchHttpRequest, MediaFileUpload
+from googleapiclient.errors import HttpError
 from google.auth.exceptions import RefreshError
 import os
+import json
+import hashlib
 import pickle
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from urllib.parse import urljoin, urlsplit
 import webbrowser
 import socket
 
+# Resumable upload chunk size; must be a multiple of 256 KB
+UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024
+
+# Maximum number of calls in one Drive HTTP batch request
+BATCH_SIZE = 100
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Marks the folder cache as not yet loaded for any account
+_NOT_LOADED = object()
+
+# Parsed Drive v3 discovery document, shared by every service built in this process
+_discovery_document = None
+_discovery_lock = threading.Lock()
+
+
+def _drive_discovery_document():
+    """Return the Drive v3 discovery document bundled with googleapiclient.
+
+    build() re-reads and re-parses the ~150 KB document for every service,
+    and a service is built per upload thread; parse it once instead. Returns
+    None if this googleapiclient has no static copy."""
+    global _discovery_document
+    with _discovery_lock:
+        if _discovery_document is None:
+            document = discovery_cache.get_static_doc('drive', 'v3')
+            if document is None:
+                return None
+            _discovery_document = json.loads(document)
+        return _discovery_document
+
 class GoogleDriveManager:
-    def __init__(self):
+    def __init__(self, upload_workers=1, chunk_size=UPLOAD_CHUNK_SIZE, max_retries=5, sessions_path='.upload_sessions.json', api_endpoint=None, folder_cache_path='.drive_folders.json', batch_size=BATCH_SIZE):
         self.SCOPES = ['https://www.googleapis.com/auth/drive.file']
         self.creds = None
         self.service = None
         self.root_folder_name = 'mentors_audio'
         self.root_folder_id = None
         self.current_mentor_folder_id = None
+        self.current_mentor_name = None
+
+        # Folder IDs keyed on "<parent id>/<name>", persisted between runs.
+        # Loaded once the account is known, since IDs differ between accounts.
+        self.folder_cache_path = Path(folder_cache_path) if folder_cache_path else None
+        self.folder_ids = {}
+        self._folder_account = _NOT_LOADED
+        self._folders_lock = threading.RLock()
+
+        # Upload engine settings
+        self.upload_workers = upload_workers
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.batch_size = batch_size
+        # Override the Drive endpoint, e.g. to point at a local fake server
+        self.api_endpoint = api_endpoint
+
+        # Resumable session URIs persisted so interrupted uploads can continue
+        self.sessions_path = Path(sessions_path) if sessions_path else None
+        self._sessions_lock = threading.Lock()
+
+        # googleapiclient services are not thread-safe, so each upload thread gets its own
+        self._local = threading.local()
+
+        # Upload slots shared by all aupload_folder calls on one event loop
+        self._async_loop = None
+        self._async_uploads = None
 
     def authenticate(self):
         """Authenticate with Google Drive"""
+        # Only needed for the OAuth flow, so not imported with the module
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        from google.auth.transport.requests import Request
         try:
             # Try to load existing credentials
             if os.path.exists('token.pickle'):
@@ -61,7 +129,7 @@ class GoogleDriveManager:
                         pickle.dump(self.creds, token)
 
             # Build the service
-            self.service = build('drive', 'v3', credentials=self.creds)
+            self.service = self._build_service()
             return True
 
         except Exception as e:
@@ -75,11 +143,72 @@ class GoogleDriveManager:
                 os.remove('token.pickle')
             return False
 
+    def _folder_cache_key(self, folder_name, parent_id=None):
+        return f"{parent_id}/{folder_name}" if parent_id else folder_name
+
+    def _account(self):
+        """Identify the signed-in account without an API call.
+
+        The refresh token belongs to one account (and this OAuth client), so
+        a different account never sees this one's folder IDs; signing in
+        again only costs one folder lookup."""
+        token = getattr(self.creds, 'refresh_token', None)
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()[:16] if token else None
+
+    def _load_folder_cache(self):
+        """Load the cached folder IDs of the signed-in account, once per account"""
+        account = self._account()
+        if account == self._folder_account:
+            return
+        self._folder_account = account
+        self.folder_ids = {}
+        if not self.folder_cache_path or not self.folder_cache_path.exists():
+            return
+        try:
+            with open(self.folder_cache_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('account') == account:
+            self.folder_ids = data.get('folders', {})
+
+    def _save_folder_cache(self):
+        if not self.folder_cache_path:
+            return
+        tmp_path = self.folder_cache_path.with_name(self.folder_cache_path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'account': self._folder_account, 'folders': self.folder_ids}, f, indent=2)
+        os.replace(tmp_path, self.folder_cache_path)
+
+    def clear_folder_cache(self):
+        """Forget all cached folder IDs, e.g. after a folder was deleted in Drive"""
+        with self._folders_lock:
+            self._load_folder_cache()
+            self.folder_ids = {}
+            self._save_folder_cache()
+        self.current_mentor_name = None
+        self.current_mentor_folder_id = None
+
     def create_or_get_folder(self, folder_name, parent_id=None):
-        """Create a folder in Google Drive or get its ID if it exists"""
+        """Create a folder in Google Drive or get its ID if it exists.
+        IDs are cached in memory and on disk, so each folder is looked up
+        at most once per run and not at all on later runs."""
         if not self.service:
             self.authenticate()
 
+        cache_key = self._folder_cache_key(folder_name, parent_id)
+        with self._folders_lock:
+            self._load_folder_cache()
+            if cache_key in self.folder_ids:
+                return self.folder_ids[cache_key]
+
+            folder_id = self._find_or_create_folder(folder_name, parent_id)
+            self.folder_ids[cache_key] = folder_id
+            self._save_folder_cache()
+            return folder_id
+
+    def _folder_list_request(self, service, folder_name, parent_id=None):
+        """Build (without executing) the query for a folder by name"""
         # Build the query to find folders with the given name
         query = [
             f"name='{folder_name}'",
@@ -94,34 +223,209 @@ class GoogleDriveManager:
         # Combine all query conditions
         query_string = " and ".join(query)
 
-        results = self.service.files().list(
+        return service.files().list(
             q=query_string,
             spaces='drive',
             fields='files(id, name, parents)'
-        ).execute()
+        )
+
+    def _folder_create_request(self, service, folder_name, parent_id=None):
+        """Build (without executing) the request creating a folder"""
+        # Create new folder with specified parent
+        file_metadata = {
+            'name': folder_name,
+            'mimeType': 'application/vnd.google-apps.folder'
+        }
+        if parent_id:
+            file_metadata['parents'] = [parent_id]
+
+        return service.files().create(
+            body=file_metadata,
+            fields='id'
+        )
 
+    @staticmethod
+    def _pick_folder(results, parent_id=None):
+        """Return the ID of the matching folder in a list response, if any"""
         folders = results.get('files', [])
 
         # If parent_id is specified, ensure we only get folders that are direct children
         if parent_id and folders:
             folders = [f for f in folders if parent_id in f.get('parents', [])]
 
-        if folders:
-            return folders[0]['id']
-        else:
-            # Create new folder with specified parent
-            file_metadata = {
-                'name': folder_name,
-                'mimeType': 'application/vnd.google-apps.folder'
-            }
-            if parent_id:
-                file_metadata['parents'] = [parent_id]
-
-            folder = self.service.files().create(
-                body=file_metadata,
-                fields='id'
-            ).execute()
-            return folder['id']
+        return folders[0]['id'] if folders else None
+
+    def _find_or_create_folder(self, folder_name, parent_id=None):
+        """Look up a folder by name in Drive, creating it if missing"""
+        service = self._thread_service()
+        results = self._folder_list_request(service, folder_name, parent_id).execute()
+        folder_id = self._pick_folder(results, parent_id)
+        if folder_id:
+            return folder_id
+        return self._folder_create_request(service, folder_name, parent_id).execute()['id']
+
+    def execute_batch(self, requests, callback=None):
+        """Execute Drive API requests using HTTP batch requests.
+
+        Requests are sent in batches of up to batch_size; items that fail
+        with a retryable status are re-batched with exponential backoff.
+        callback(index, response, error) is called once per request.
+        Returns a list of (response, error) tuples in request order, where
+        error is the HttpError for failed items and None otherwise."""
+        service = self._thread_service()
+        results = [(None, None)] * len(requests)
+        pending = list(range(len(requests)))
+        attempt = 0
+
+        while pending:
+            retry = []
+
+            def handle(request_id, response, exception):
+                index = int(request_id)
+                if isinstance(exception, HttpError) and exception.resp.status in RETRYABLE_STATUS_CODES and attempt < self.max_retries:
+                    retry.append(index)
+                    return
+                results[index] = (response, exception)
+
+            for start in range(0, len(pending), self.batch_size):
+                batch = self._new_batch(service, handle)
+                for index in pending[start:start + self.batch_size]:
+                    batch.add(requests[index], request_id=str(index))
+                batch.execute()
+
+            pending = sorted(retry)
+            if pending:
+                attempt += 1
+                print(f"Retrying {len(pending)} batched Drive requests (attempt {attempt}/{self.max_retries})")
+                self._backoff(attempt)
+
+        if callback:
+            for index, (response, error) in enumerate(results):
+                callback(index, response, error)
+        return results
+
+    def _new_batch(self, service, callback):
+        """Start a batch request on the same host as the other Drive calls"""
+        if self.api_endpoint:
+            # googleapiclient only applies api_endpoint to regular requests
+            return BatchHttpRequest(callback=callback, batch_uri=urljoin(self.api_endpoint, '/batch/drive/v3'))
+        return service.new_batch_http_request(callback=callback)
+
+    def ensure_mentor_folders(self, mentor_names):
+        """Ensure folders exist for many mentors using batched requests.
+        Returns a dict of mentor name to folder ID."""
+        if not self.service:
+            self.authenticate()
+
+        self.root_folder_id = self.create_or_get_folder(self.root_folder_name)
+        service = self._thread_service()
+
+        folder_ids = {}
+        missing = []
+        with self._folders_lock:
+            self._load_folder_cache()
+            for name in dict.fromkeys(mentor_names):
+                cache_key = self._folder_cache_key(name, self.root_folder_id)
+                if cache_key in self.folder_ids:
+                    folder_ids[name] = self.folder_ids[cache_key]
+                else:
+                    missing.append(name)
+
+            if missing:
+                # Look up all uncached folders in one round of batches
+                lookups = self.execute_batch([
+                    self._folder_list_request(service, name, self.root_folder_id) for name in missing
+                ])
+                to_create = []
+                for name, (response, error) in zip(missing, lookups):
+                    if error:
+                        raise error
+                    folder_id = self._pick_folder(response, self.root_folder_id)
+                    if folder_id:
+                        folder_ids[name] = folder_id
+                    else:
+                        to_create.append(name)
+
+                # Then create the ones that do not exist yet
+                if to_create:
+                    created = self.execute_batch([
+                        self._folder_create_request(service, name, self.root_folder_id) for name in to_create
+                    ])
+                    for name, (response, error) in zip(to_create, created):
+                        if error:
+                            raise error
+                        folder_ids[name] = response['id']
+
+                for name in missing:
+                    self.folder_ids[self._folder_cache_key(name, self.root_folder_id)] = folder_ids[name]
+                self._save_folder_cache()
+
+        print(f"Ensured {len(folder_ids)} mentor folders ({len(missing)} looked up in Drive)")
+        return folder_ids
+
+    def stale_folders(self, folder_ids):
+        """Return the folder IDs that no longer exist in Drive or are in the
+        trash, checked with batched requests. Cached IDs can go stale when a
+        folder is deleted or trashed in the Drive UI."""
+        service = self._thread_service()
+        folder_ids = list(dict.fromkeys(folder_ids))
+        results = self.execute_batch([
+            service.files().get(fileId=folder_id, fields='id, trashed') for folder_id in folder_ids
+        ])
+        stale = set()
+        for folder_id, (response, error) in zip(folder_ids, results):
+            if error is not None:
+                if error.resp.status != 404:
+                    raise error
+                stale.add(folder_id)
+            elif response.get('trashed'):
+                stale.add(folder_id)
+        return stale
+
+    def rename_files(self, new_names):
+        """Rename Drive files in batches. new_names maps file ID to new name.
+        Returns a dict of file ID to the error for any that failed."""
+        service = self._thread_service()
+        file_ids = list(new_names)
+        results = self.execute_batch([
+            service.files().update(fileId=file_id, body={'name': new_names[file_id]}, fields='id')
+            for file_id in file_ids
+        ])
+        return {file_id: error for file_id, (_, error) in zip(file_ids, results) if error}
+
+    def delete_files(self, file_ids):
+        """Delete Drive files in batches.
+        Returns a dict of file ID to the error for any that failed."""
+        service = self._thread_service()
+        file_ids = list(file_ids)
+        results = self.execute_batch([service.files().delete(fileId=file_id) for file_id in file_ids])
+        return {file_id: error for file_id, (_, error) in zip(file_ids, results) if error}
+
+    def list_folders(self, folder_ids):
+        """List several Drive folders using batched requests.
+        Returns a dict of folder ID to its files (id, name, md5Checksum, size)."""
+        service = self._thread_service()
+        folder_ids = list(folder_ids)
+        results = self.execute_batch([
+            service.files().list(
+                q=f"'{folder_id}' in parents and trashed=false",
+                spaces='drive',
+                fields='nextPageToken, files(id, name, md5Checksum, size)',
+                pageSize=1000
+            )
+            for folder_id in folder_ids
+        ])
+
+        listings = {}
+        for folder_id, (response, error) in zip(folder_ids, results):
+            if error:
+                raise error
+            if response.get('nextPageToken'):
+                # Rare for a mentor folder; fetch the remaining pages directly
+                listings[folder_id] = self.list_folder(folder_id)
+            else:
+                listings[folder_id] = response.get('files', [])
+        return listings
 
     def ensure_mentor_folder(self, mentor_name):
         """Ensure the root and mentor-specific folders exist"""
@@ -134,60 +438,353 @@ class GoogleDriveManager:
 
         # Create or get mentor folder inside root folder
         self.current_mentor_folder_id = self.create_or_get_folder(mentor_name, self.root_folder_id)
+        self.current_mentor_name = mentor_name
         print(f"Mentor folder '{mentor_name}' ID: {self.current_mentor_folder_id}")
 
         return self.current_mentor_folder_id
 
-    def upload_file(self, file_path, mentor_name):
-        """Upload a file to the mentor's folder in Google Drive"""
-        if not self.service:
-            self.authenticate()
-
-        # Ensure folders exist
-        if not self.current_mentor_folder_id or self.current_mentor_folder_id != mentor_name:
-            self.ensure_mentor_folder(mentor_name)
+    def _build_service(self):
+        """Build a Drive service for the current credentials"""
+        client_options = {'api_endpoint': self.api_endpoint} if self.api_endpoint else None
+        document = _drive_discovery_document()
+        if document is None:
+            return build('drive', 'v3', credentials=self.creds, client_options=client_options)
+        return build_from_document(document, credentials=self.creds, client_options=client_options)
+
+    def _thread_service(self):
+        """Return a Drive service owned by the calling thread"""
+        if threading.current_thread() is threading.main_thread():
+            return self.service
+        if getattr(self._local, 'service', None) is None:
+            self._local.service = self._build_service()
+        return self._local.service
+
+    def _load_sessions(self):
+        if not self.sessions_path or not self.sessions_path.exists():
+            return {}
+        try:
+            with open(self.sessions_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _update_session(self, key, session):
+        """Persist (or with session=None, forget) a resumable upload session"""
+        if not self.sessions_path:
+            return
+        with self._sessions_lock:
+            sessions = self._load_sessions()
+            if session:
+                sessions[key] = session
+            else:
+                sessions.pop(key, None)
+            tmp_path = self.sessions_path.with_name(self.sessions_path.name + '.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(sessions, f, indent=2)
+            os.replace(tmp_path, self.sessions_path)
+
+    def _backoff(self, attempt):
+        """Sleep with jittered exponential backoff before retry number attempt"""
+        delay = min(2 ** attempt, 64) + random.uniform(0, 1)
+        time.sleep(delay)
+
+    def list_folder(self, folder_id):
+        """List the files in a Drive folder with their size and MD5 checksum"""
+        service = self._thread_service()
+        files = []
+        page_token = None
+        while True:
+            results = service.files().list(
+                q=f"'{folder_id}' in parents and trashed=false",
+                spaces='drive',
+                fields='nextPageToken, files(id, name, md5Checksum, size)',
+                pageSize=1000,
+                pageToken=page_token
+            ).execute()
+            files.extend(results.get('files', []))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return files
+
+    @staticmethod
+    def file_md5(file_path):
+        """Compute the MD5 checksum Drive reports for a local file"""
+        digest = hashlib.md5()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def upload_to_folder(self, file_path, folder_id, file_id=None):
+        """Upload a file into a Drive folder in resumable chunks.
+
+        Progress is reported per chunk, the session URI is persisted so a
+        later run can resume the same upload, and rate limiting or server
+        errors are retried with exponential backoff. If file_id is given
+        that Drive file's content is replaced instead of creating a new one."""
+        file_path = Path(file_path)
+        stat = file_path.stat()
+        session_key = str(file_path.resolve())
+        service = self._thread_service()
 
         # Upload the file
         file_metadata = {
-            'name': Path(file_path).name,
-            'parents': [self.current_mentor_folder_id]
+            'name': file_path.name,
+            'parents': [folder_id]
         }
 
         media = MediaFileUpload(
-            file_path,
-            mimetype='audio/mpeg',
+            str(file_path),
+            mimetype='audio/mpeg' if file_path.suffix == '.mp3' else 'application/octet-stream',
+            chunksize=self.chunk_size,
             resumable=True
         )
 
-        file = self.service.files().create(
-            body=file_metadata,
-            media_body=media,
-            fields='id'
-        ).execute()
+        if file_id:
+            # Update in place; the parent folder cannot be set on update
+            request = service.files().update(
+                fileId=file_id,
+                media_body=media,
+                fields='id'
+            )
+        else:
+            request = service.files().create(
+                body=file_metadata,
+                media_body=media,
+                fields='id'
+            )
+
+        if self.api_endpoint:
+            # googleapiclient moves media uploads to the endpoint's host but keeps https
+            endpoint = urlsplit(self.api_endpoint)
+            request.uri = urlsplit(request.uri)._replace(scheme=endpoint.scheme, netloc=endpoint.netloc).geturl()
+
+        # Continue a previous session for this exact file and destination
+        resume = False
+        saved = self._load_sessions().get(session_key)
+        if (saved and saved.get('size') == stat.st_size and saved.get('mtime') == stat.st_mtime
+                and saved.get('folder_id') == folder_id and saved.get('file_id') == file_id):
+            print(f"Resuming upload: {file_path.name}")
+            request.resumable_uri = saved['uri']
+            resume = True
+        else:
+            saved = None
+
+        response = None
+        attempt = 0
+        while response is None:
+            try:
+                if resume:
+                    # Ask the server how much it already has before sending more
+                    response = self._resume_upload(request, stat.st_size)
+                    resume = False
+                    if not request.resumable_uri:
+                        # Session expired: start this file over
+                        self._update_session(session_key, None)
+                        saved = None
+                    continue
+                status, response = request.next_chunk()
+                attempt = 0
+            except HttpError as e:
+                if e.resp.status in (404, 410) and request.resumable_uri:
+                    # Session expired: start this file over
+                    request.resumable_uri = None
+                    request.resumable_progress = 0
+                    self._update_session(session_key, None)
+                    saved = None
+                    continue
+                if e.resp.status not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                print(f"Retrying {file_path.name} after HTTP {e.resp.status} (attempt {attempt}/{self.max_retries})")
+                self._backoff(attempt)
+                continue
+            except (OSError, socket.timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                print(f"Retrying {file_path.name} after {str(e)} (attempt {attempt}/{self.max_retries})")
+                self._backoff(attempt)
+                # Resume from whatever the server received
+                resume = request.resumable_uri is not None
+                continue
+
+            if status:
+                if request.resumable_uri and not saved:
+                    saved = {
+                        'uri': request.resumable_uri,
+                        'size': stat.st_size,
+                        'mtime': stat.st_mtime,
+                        'folder_id': folder_id,
+                        'file_id': file_id
+                    }
+                    self._update_session(session_key, saved)
+                print(f"Uploading {file_path.name}: {int(status.progress() * 100)}%")
+
+        if saved:
+            self._update_session(session_key, None)
+        return response['id']
+
+    @staticmethod
+    def _resume_upload(request, size):
+        """Sync a resumable upload request with the server's progress.
+
+        Sends the status query of the resumable upload protocol, an empty
+        PUT with "Content-Range: bytes */<size>", and moves the request's
+        resumable_progress to the bytes the server has. Returns the file
+        resource if the upload had already completed, otherwise None; an
+        expired session clears request.resumable_uri."""
+        resp, content = request.http.request(
+            request.resumable_uri,
+            method='PUT',
+            body=b'',
+            headers={'Content-Length': '0', 'Content-Range': f'bytes */{size}'}
+        )
+        if resp.status in (200, 201):
+            return json.loads(content)
+        if resp.status == 308:
+            # "Range: bytes=0-<last byte received>"; absent if nothing arrived
+            received = resp.get('range')
+            request.resumable_progress = int(received.rsplit('-', 1)[1]) + 1 if received else 0
+            return None
+        if resp.status in (404, 410):
+            request.resumable_uri = None
+            request.resumable_progress = 0
+            return None
+        raise HttpError(resp, content, uri=request.resumable_uri)
+
+    def sync_file(self, file_path, folder_id, remote=None):
+        """Upload file_path unless remote (its Drive listing entry) already
+        has the same content. Returns the upload result, or None if skipped."""
+        file_path = Path(file_path)
+        if remote:
+            if remote.get('md5Checksum') == self.file_md5(file_path):
+                print(f"Unchanged: {file_path.name}")
+                return None
+            print(f"Updating: {file_path.name}")
+            status = 'updated'
+        else:
+            print(f"Uploading: {file_path.name}")
+            status = 'uploaded'
+        file_id = self.upload_to_folder(file_path, folder_id, remote['id'] if remote else None)
+        print(f"Successfully uploaded: {file_path.name}")
+        return {
+            'file_name': file_path.name,
+            'file_id': file_id,
+            'status': status
+        }
+
+    def upload_file(self, file_path, mentor_name):
+        """Upload a file to the mentor's folder in Google Drive"""
+        if not self.service:
+            self.authenticate()
 
-        return file['id']
+        # Ensure folders exist
+        if not self.current_mentor_folder_id or self.current_mentor_name != mentor_name:
+            self.ensure_mentor_folder(mentor_name)
+
+        return self.upload_to_folder(file_path, self.current_mentor_folder_id)
 
-    def upload_folder(self, local_folder_path, mentor_name):
-        """Upload all files from a local folder to Google Drive"""
+    def _plan_folder_upload(self, local_folder_path, mentor_name, file_names=None, sync=True):
+        """Resolve the Drive folder and local files of an upload_folder call.
+        Returns (file_paths, upload), where upload(file_path) syncs one file
+        and returns it if it was transferred."""
         if not self.service:
             self.authenticate()
 
         # Ensure mentor folder exists
-        self.ensure_mentor_folder(mentor_name)
+        folder_id = self.ensure_mentor_folder(mentor_name)
 
         folder_path = Path(local_folder_path)
         if not folder_path.exists():
             raise ValueError(f"Folder not found: {local_folder_path}")
 
+        file_paths = [
+            file_path for file_path in sorted(folder_path.glob('*.mp3'))
+            if file_names is None or file_path.name in file_names
+        ]
+
         print(f"\nUploading files from {local_folder_path} to Google Drive mentor folder: {mentor_name}")
-        uploaded_files = []
-        for file_path in folder_path.glob('*.mp3'):
-            print(f"Uploading: {file_path.name}")
-            file_id = self.upload_file(str(file_path), mentor_name)
-            uploaded_files.append({
-                'file_name': file_path.name,
-                'file_id': file_id
-            })
-            print(f"Successfully uploaded: {file_path.name}")
 
+        remote_files = {}
+        if sync:
+            for remote in self.list_folder(folder_id):
+                remote_files.setdefault(remote['name'], remote)
+
+        def upload(file_path):
+            return self.sync_file(file_path, folder_id, remote_files.get(file_path.name))
+
+        return file_paths, upload
+
+    def _stale_folder(self, error, retry_stale_folder):
+        """Whether an upload_folder call should be retried after error,
+        because a cached folder ID no longer exists in Drive"""
+        if error.resp.status != 404 or retry_stale_folder is False:
+            return False
+        print("Cached Drive folder not found, refreshing folder IDs...")
+        self.clear_folder_cache()
+        return True
+
+    @staticmethod
+    def _uploaded_files(results, file_paths, sync):
+        """Return the files an upload_folder call transferred"""
+        uploaded_files = [result for result in results if result]
+        if sync:
+            print(f"{len(file_paths) - len(uploaded_files)} files already up to date in Google Drive")
         return uploaded_files
+
+    def upload_folder(self, local_folder_path, mentor_name, file_names=None, workers=None, sync=True, retry_stale_folder=True):
+        """Upload all files from a local folder to Google Drive.
+        If file_names is given, only those files are uploaded. Files are
+        uploaded by `workers` threads (default: upload_workers).
+        With sync, the Drive folder is listed once and files whose MD5
+        matches are skipped, while changed files are updated in place.
+        Returns the files that were actually transferred."""
+        workers = workers or self.upload_workers
+        try:
+            file_paths, upload = self._plan_folder_upload(local_folder_path, mentor_name, file_names, sync)
+            if workers > 1 and len(file_paths) > 1:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(upload, file_paths))
+            else:
+                results = [upload(file_path) for file_path in file_paths]
+        except HttpError as e:
+            if not self._stale_folder(e, retry_stale_folder):
+                raise
+            return self.upload_folder(local_folder_path, mentor_name, file_names, workers, sync, retry_stale_folder=False)
+        return self._uploaded_files(results, file_paths, sync)
+
+    def _upload_slots(self):
+        """Return the semaphore bounding concurrent uploads on the running event loop"""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_loop = loop
+            self._async_uploads = asyncio.Semaphore(max(1, self.upload_workers))
+        return self._async_uploads
+
+    async def aupload_folder(self, local_folder_path, mentor_name, file_names=None, workers=None, sync=True, retry_stale_folder=True):
+        """Async version of upload_folder, for use inside an event loop.
+
+        googleapiclient has no async transport, so each Drive call runs in a
+        worker thread with its own service object. At most upload_workers
+        uploads are in flight across all aupload_folder calls on the loop, or
+        `workers` for this call when given. Returns the files transferred."""
+        # Imported here so the sync upload path never pays for loading asyncio
+        import asyncio
+
+        slots = asyncio.Semaphore(workers) if workers else self._upload_slots()
+        try:
+            file_paths, upload = await asyncio.to_thread(self._plan_folder_upload, local_folder_path, mentor_name, file_names, sync)
+
+            async def upload_async(file_path):
+                async with slots:
+                    return await asyncio.to_thread(upload, file_path)
+
+            results = await asyncio.gather(*(upload_async(file_path) for file_path in file_paths))
+        except HttpError as e:
+            if not self._stale_folder(e, retry_stale_folder):
+                raise
+            return await self.aupload_folder(local_folder_path, mentor_name, file_names, workers, sync, retry_stale_folder=False)
+        return self._uploaded_files(results, file_paths, sync)
@@ -0,0 +1,82 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+# Story states, in the order a story moves through them
+PENDING = 'pending'
+SYNTHESIZING = 'synthesizing'
+SAVED = 'saved'
+UPLOADED = 'uploaded'
+FAILED = 'failed'
+
+
+class JobJournal:
+    """Write-ahead journal of each story's progress through a run.
+
+    Stored as journal.jsonl in the mentor's output directory. Every state
+    change is appended and flushed to disk before the run moves on, so after
+    a crash or Ctrl-C the journal shows exactly which stories were saved and
+    which of those still have to be uploaded."""
+
+    FILENAME = 'journal.jsonl'
+
+    def __init__(self, output_dir):
+        self.path = Path(output_dir) / self.FILENAME
+        self.entries = {}
+        self._file = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Replay the journal from disk, keeping the latest state of each story"""
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash
+                    continue
+                self.entries[record['name']] = {'state': record['state'], 'hash': record.get('hash')}
+
+    def open(self, resume=False):
+        """Start journaling. With resume the previous run's journal is kept,
+        compacted to one line per story; otherwise it is discarded."""
+        if resume:
+            self.load()
+        else:
+            self.entries = {}
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for name, entry in sorted(self.entries.items()):
+                f.write(json.dumps({'name': name, **entry}) + '\n')
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        return self
+
+    def mark(self, file_name, state, fingerprint=None):
+        """Record a story's new state and flush it to disk"""
+        file_name = Path(file_name).name
+        with self._lock:
+            entry = self.entries.setdefault(file_name, {'state': state, 'hash': fingerprint})
+            entry['state'] = state
+            if fingerprint is not None:
+                entry['hash'] = fingerprint
+            if self._file:
+                self._file.write(json.dumps({'name': file_name, **entry}) + '\n')
+                self._file.flush()
+                os.fsync(self._file.fileno())
+
+    def state(self, file_name, fingerprint):
+        """Return a story's last state, or None if it was recorded with other text or settings"""
+        entry = self.entries.get(Path(file_name).name)
+        if not entry or entry.get('hash') != fingerprint:
+            return None
+        return entry['state']
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
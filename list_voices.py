@@ -1,13 +1,11 @@
-from elevenlabs import voices, set_api_key
-import os
 from dotenv import load_dotenv
+from text_to_speech import ElevenLabsManager
 
 load_dotenv()
 
-api_key = os.getenv('ELEVEN_LABS_API_KEY')
-set_api_key(api_key)
-
-all_voices = voices()
+# Shares the on-disk voice cache with text_to_speech.py, and like it only
+# fetches the catalogue over HTTP when the cache is stale
+all_voices = ElevenLabsManager().list_available_voices()
 print("\nAvailable voices:")
 for voice in all_voices:
     print(f"- {voice.name}")
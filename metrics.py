@@ -0,0 +1,134 @@
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds in seconds, Prometheus style
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, math.inf)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; memory use does not grow with the number of observations"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating within its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, self.counts):
+            if count and seen + count >= rank:
+                upper = min(bound, self.max)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return self.max
+
+
+class Metrics:
+    """Per-stage latency histograms and run counters.
+
+    Stages are timed with timer() and counters bumped with increment(). When
+    events_path is set every observation is also appended to it as a JSON
+    line as it happens; write_prometheus() writes a textfile for the node
+    exporter's textfile collector, and summary() formats a table for --profile."""
+
+    def __init__(self, events_path=None):
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._events = open(events_path, 'a', encoding='utf-8') if events_path else None
+
+    def _emit(self, record):
+        if self._events:
+            record['ts'] = round(time.time(), 6)
+            self._events.write(json.dumps(record) + '\n')
+
+    def observe(self, stage, seconds, **labels):
+        """Record one duration for a stage; labels only go to the JSON lines"""
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+            self._emit({'type': 'timing', 'stage': stage, 'seconds': round(seconds, 6), **labels})
+
+    @contextmanager
+    def timer(self, stage, **labels):
+        """Time the enclosed block as one observation of stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, **labels)
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def write_prometheus(self, path, prefix='tts'):
+        """Write all metrics in the Prometheus text exposition format, atomically"""
+        with self._lock:
+            lines = [
+                f"# HELP {prefix}_stage_seconds Time spent per pipeline stage",
+                f"# TYPE {prefix}_stage_seconds histogram"
+            ]
+            for stage, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == math.inf else repr(float(bound))
+                    lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                lines.append(f"{prefix}_{name}_total {value}")
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, path)
+
+    def summary(self):
+        """Return a table of stage latencies followed by the counters"""
+        with self._lock:
+            rows = [f"{'stage':<24}{'count':>8}{'total s':>10}{'mean s':>10}{'p50 s':>10}{'p95 s':>10}{'max s':>10}"]
+            # Slowest stages first: the likely bottleneck tops the table
+            for stage, histogram in sorted(self.histograms.items(), key=lambda item: -item[1].sum):
+                mean = histogram.sum / histogram.count if histogram.count else 0.0
+                rows.append(
+                    f"{stage:<24}{histogram.count:>8}{histogram.sum:>10.2f}{mean:>10.3f}"
+                    f"{histogram.quantile(0.5):>10.3f}{histogram.quantile(0.95):>10.3f}{histogram.max:>10.3f}"
+                )
+            for name, value in sorted(self.counters.items()):
+                rows.append(f"{name:<24}{value:>8}")
+        return '\n'.join(rows)
+
+    def close(self):
+        """Append the final counters to the JSON lines and close the file"""
+        with self._lock:
+            if self._events:
+                for name, value in sorted(self.counters.items()):
+                    self._emit({'type': 'counter', 'name': name, 'value': value})
+                self._events.close()
+                self._events = None
@@ -0,0 +1,113 @@
+"""Minimal MP3 (MPEG Layer III) frame handling.
+
+Only what the pipeline needs to join and measure MP3 files without
+re-encoding them: locating tags, walking frame headers and dropping the
+Xing/Info header frame whose frame count would be wrong after a join."""
+
+# Layer III bitrates in kbps, indexed by the header's bitrate field
+BITRATES = {
+    'mpeg1': [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    'mpeg2': [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+
+SAMPLE_RATES = {
+    3: [44100, 48000, 32000],  # MPEG 1
+    2: [22050, 24000, 16000],  # MPEG 2
+    0: [11025, 12000, 8000],   # MPEG 2.5
+}
+
+
+def id3v2_size(data):
+    """Return the length of a leading ID3v2 tag, or 0 if there is none"""
+    if len(data) < 10 or data[:3] != b'ID3':
+        return 0
+    # Tag size is a 28-bit "syncsafe" integer (7 bits per byte)
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def parse_frame_header(data, offset):
+    """Parse the Layer III frame header at offset.
+
+    Returns (frame_length, samples_per_frame, sample_rate) or None if the
+    bytes at offset are not a valid frame header."""
+    if offset + 4 > len(data):
+        return None
+    b1, b2 = data[offset + 1], data[offset + 2]
+    if data[offset] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version = (b1 >> 3) & 0x03
+    layer = (b1 >> 1) & 0x03
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x03
+    padding = (b2 >> 1) & 0x01
+
+    # Reserved version, non Layer III, free/bad bitrate or reserved sample rate
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    sample_rate = SAMPLE_RATES[version][sample_rate_index]
+    if version == 3:
+        bitrate = BITRATES['mpeg1'][bitrate_index] * 1000
+        return 144 * bitrate // sample_rate + padding, 1152, sample_rate
+
+    bitrate = BITRATES['mpeg2'][bitrate_index] * 1000
+    return 72 * bitrate // sample_rate + padding, 576, sample_rate
+
+
+def audio_frames(data):
+    """Return (start, end) of the MPEG audio frames in data.
+
+    Excludes ID3v2/ID3v1 tags and a leading Xing/Info header frame."""
+    start = id3v2_size(data)
+    end = len(data)
+    if end - start >= 128 and data[end - 128:end - 125] == b'TAG':
+        end -= 128
+
+    header = parse_frame_header(data, start)
+    if header:
+        frame_length = header[0]
+        # The Xing/Info tag sits after the side info, within the first 40 bytes
+        if b'Xing' in data[start:start + 40] or b'Info' in data[start:start + 40]:
+            start += frame_length
+    return start, end
+
+
+def concat_mp3(parts):
+    """Join MP3 files into one stream without re-encoding.
+
+    The first part keeps its ID3v2 tag; all other tags and Xing/Info
+    frames are dropped so players compute the duration from the frames."""
+    output = bytearray()
+    for index, part in enumerate(parts):
+        if index == 0:
+            output += part[:id3v2_size(part)]
+        start, end = audio_frames(part)
+        output += part[start:end]
+    return bytes(output)
+
+
+def iter_frames(data, start=0, end=None):
+    """Yield (offset, frame_length, samples, sample_rate) for each frame.
+
+    Walks frame headers from start until end or the first invalid header,
+    e.g. a trailing tag."""
+    end = len(data) if end is None else end
+    offset = start
+    while offset < end:
+        header = parse_frame_header(data, offset)
+        if not header:
+            return
+        frame_length, samples, sample_rate = header
+        if frame_length <= 0 or offset + frame_length > end:
+            return
+        yield offset, frame_length, samples, sample_rate
+        offset += frame_length
+
+
+def mp3_duration(data):
+    """Return the playing time of MP3 data in seconds, counted from its frames"""
+    start, end = audio_frames(data)
+    return sum(samples / sample_rate for _, _, samples, sample_rate in iter_frames(data, start, end))
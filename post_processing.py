@@ -0,0 +1,231 @@
+"""Loudness normalisation and silence trimming of synthesized audio.
+
+Files are decoded to sample buffers, processed with vectorised NumPy and
+written back in their original format. WAV files are read directly; MP3
+files are decoded and re-encoded with ffmpeg. NumPy is optional for the
+rest of the pipeline, so this module is only imported when post-processing
+is enabled."""
+import os
+import shutil
+import multiprocessing
+import subprocess
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from mp3_utils import audio_frames, parse_frame_header
+
+# Loudness target as RMS level in dBFS, and the peak level it may not exceed
+TARGET_DBFS = -20.0
+PEAK_CEILING_DBFS = -1.0
+
+# Frames quieter than this (RMS, dBFS) count as silence when trimming
+SILENCE_THRESHOLD_DBFS = -50.0
+
+# Analysis window for silence detection, and silence kept at each end
+SILENCE_WINDOW_MS = 10
+SILENCE_PADDING_MS = 50
+
+# Bitrate of re-encoded MP3 files, matching the synthesis output format
+MP3_BITRATE = '128k'
+
+
+def _mp3_format(data):
+    """Return (sample_rate, channels) from the first MP3 frame header"""
+    start, _ = audio_frames(data)
+    header = parse_frame_header(data, start)
+    if not header:
+        raise ValueError("Not an MP3 file")
+    # Channel mode 3 is mono; the others are stereo variants
+    channels = 1 if data[start + 3] >> 6 == 3 else 2
+    return header[2], channels
+
+
+def read_audio(path):
+    """Decode a WAV or MP3 file to (float32 samples of shape (n, channels), sample_rate)"""
+    path = Path(path)
+    if path.suffix.lower() == '.wav':
+        with wave.open(str(path), 'rb') as f:
+            if f.getsampwidth() != 2:
+                raise ValueError(f"Only 16-bit WAV files are supported: {path}")
+            sample_rate, channels = f.getframerate(), f.getnchannels()
+            pcm = f.readframes(f.getnframes())
+    else:
+        data = path.read_bytes()
+        sample_rate, channels = _mp3_format(data)
+        pcm = subprocess.run(
+            ['ffmpeg', '-v', 'error', '-i', 'pipe:0', '-f', 's16le', '-ac', str(channels), '-ar', str(sample_rate), 'pipe:1'],
+            input=data, capture_output=True, check=True
+        ).stdout
+    samples = np.frombuffer(pcm, dtype='<i2').reshape(-1, channels)
+    return samples.astype(np.float32) / 32768.0, sample_rate
+
+
+def write_audio(path, samples, sample_rate, audio_format=None):
+    """Encode float samples to path as 'wav' or 'mp3' (default: from the suffix)"""
+    path = Path(path)
+    audio_format = audio_format or path.suffix.lower().lstrip('.')
+    pcm = (np.clip(samples, -1.0, 32767 / 32768) * 32768.0).astype('<i2').tobytes()
+    channels = samples.shape[1]
+    if audio_format == 'wav':
+        with wave.open(str(path), 'wb') as f:
+            f.setnchannels(channels)
+            f.setsampwidth(2)
+            f.setframerate(sample_rate)
+            f.writeframes(pcm)
+        return
+    subprocess.run(
+        ['ffmpeg', '-v', 'error', '-y', '-f', 's16le', '-ar', str(sample_rate), '-ac', str(channels), '-i', 'pipe:0',
+         '-codec:a', 'libmp3lame', '-b:a', MP3_BITRATE, '-f', 'mp3', str(path)],
+        input=pcm, capture_output=True, check=True
+    )
+
+
+def rms_dbfs(samples):
+    """RMS level of samples in dBFS (-inf for digital silence)"""
+    rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float64)))) if samples.size else 0.0
+    return 20 * np.log10(rms) if rms > 0 else -np.inf
+
+
+def trim_silence(samples, sample_rate, threshold_dbfs=SILENCE_THRESHOLD_DBFS, window_ms=SILENCE_WINDOW_MS, padding_ms=SILENCE_PADDING_MS):
+    """Cut leading and trailing silence, keeping padding_ms at each end.
+    Returns the trimmed samples; all-silent audio is returned unchanged."""
+    window = max(1, sample_rate * window_ms // 1000)
+    count = len(samples) // window
+    if not count:
+        return samples
+    # RMS of each window across all channels, in one pass over the buffer
+    windows = samples[:count * window].reshape(count, -1)
+    power = np.mean(np.square(windows, dtype=np.float64), axis=1)
+    loud = np.flatnonzero(power > 10 ** (threshold_dbfs / 10))
+    if not loud.size:
+        return samples
+    padding = sample_rate * padding_ms // 1000
+    start = max(0, loud[0] * window - padding)
+    end = min(len(samples), (loud[-1] + 1) * window + padding)
+    return samples[start:end]
+
+
+def normalize_loudness(samples, target_dbfs=TARGET_DBFS, peak_ceiling_dbfs=PEAK_CEILING_DBFS):
+    """Scale samples to the target RMS level without peaks above the ceiling.
+    Returns (samples, gain in dB)."""
+    level = rms_dbfs(samples)
+    if not np.isfinite(level):
+        return samples, 0.0
+    gain_db = target_dbfs - level
+    peak = float(np.max(np.abs(samples)))
+    if peak > 0:
+        # Quiet stories with loud peaks get less gain rather than clipping
+        gain_db = min(gain_db, peak_ceiling_dbfs - 20 * np.log10(peak))
+    return samples * np.float32(10 ** (gain_db / 20)), gain_db
+
+
+def process_file(path, target_dbfs=TARGET_DBFS, silence_threshold_dbfs=SILENCE_THRESHOLD_DBFS, trim=True, normalize=True):
+    """Trim and normalise one file in place, atomically.
+
+    Runs in a worker process. Returns a dict of measurements, including
+    the CPU time this process spent on the file."""
+    cpu_started, children_started = time.process_time(), os.times()
+    path = Path(path)
+    samples, sample_rate = read_audio(path)
+    duration = len(samples) / sample_rate
+    if trim:
+        samples = trim_silence(samples, sample_rate, silence_threshold_dbfs)
+    gain_db = 0.0
+    if normalize:
+        samples, gain_db = normalize_loudness(samples, target_dbfs)
+
+    # Write a new file and rename it over the old one, so a cached hardlink
+    # of the unprocessed file is left untouched
+    tmp_path = path.with_name(path.name + '.tmp')
+    write_audio(tmp_path, samples, sample_rate, path.suffix.lower().lstrip('.'))
+    os.replace(tmp_path, path)
+
+    # ffmpeg runs in child processes, so their CPU time counts too
+    children = os.times()
+    cpu_seconds = (time.process_time() - cpu_started
+                   + children.children_user - children_started.children_user
+                   + children.children_system - children_started.children_system)
+    return {
+        'path': str(path),
+        'duration': duration,
+        'trimmed': duration - len(samples) / sample_rate,
+        'gain_db': gain_db,
+        'cpu_seconds': cpu_seconds
+    }
+
+
+class PostProcessor:
+    """Process pool that trims and loudness-normalises saved audio files.
+
+    The work runs in worker processes, so it uses every core and never
+    holds the GIL of the synthesis threads, and start() does not wait for
+    it. Each file's CPU time is reported as it finishes."""
+
+    def __init__(self, workers=None, target_dbfs=TARGET_DBFS, silence_threshold_dbfs=SILENCE_THRESHOLD_DBFS, trim=True, normalize=True, metrics=None):
+        if np is None:
+            raise ValueError("Post-processing requires NumPy: pip install numpy")
+        self.workers = workers or os.cpu_count() or 1
+        self.options = {
+            'target_dbfs': target_dbfs,
+            'silence_threshold_dbfs': silence_threshold_dbfs,
+            'trim': trim,
+            'normalize': normalize
+        }
+        self.metrics = metrics
+        self.results = []
+        self._executor = None
+        self._ffmpeg = shutil.which('ffmpeg') is not None
+
+    @property
+    def settings(self):
+        """Settings that change the processed audio, for render fingerprints"""
+        return dict(self.options)
+
+    def _pool(self):
+        if self._executor is None:
+            # Spawned, not forked: the pool starts while synthesis threads
+            # are running, and forking a threaded process is unsafe
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def submit(self, path):
+        """Queue a file for processing; returns a future of process_file's result"""
+        if not self._ffmpeg and Path(path).suffix.lower() != '.wav':
+            raise ValueError("Post-processing MP3 files requires ffmpeg on the PATH")
+        # Absolute, in case a worker process runs in another directory
+        return self._pool().submit(process_file, str(Path(path).resolve()), **self.options)
+
+    def start(self, path):
+        """Queue a file for processing without waiting for it; returns the
+        future of submit(). The result is recorded and reported when it
+        finishes, before callbacks added to the future later run."""
+        started = time.perf_counter()
+        future = self.submit(path)
+        future.add_done_callback(lambda done: self._record(path, done, started))
+        return future
+
+    def _record(self, path, future, started):
+        if future.cancelled() or future.exception():
+            return
+        result = future.result()
+        self.results.append(result)
+        if self.metrics:
+            self.metrics.observe('post_process', time.perf_counter() - started)
+            self.metrics.observe('post_process_cpu', result['cpu_seconds'], file=Path(path).name)
+        print(f"Post-processed: {path} (trimmed {result['trimmed']:.2f}s, gain {result['gain_db']:+.1f} dB, CPU {result['cpu_seconds']:.3f}s)")
+
+    def summary(self):
+        cpu_seconds = sum(result['cpu_seconds'] for result in self.results)
+        return f"Post-processing: {len(self.results)} files, {cpu_seconds:.2f}s CPU on {self.workers} processes"
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,167 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting the sustained request rate"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds):
+        """Hand out no tokens for the given time, e.g. after a Retry-After"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def try_acquire(self, tokens=1):
+        """Take tokens if available and return 0, otherwise return the seconds to wait"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if now >= self.paused_until and self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0
+            if now < self.paused_until:
+                return self.paused_until - now
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens=1):
+        """Block until tokens are available and take them"""
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens=1):
+        """Wait without blocking the event loop until tokens are available and take them"""
+        import asyncio
+
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    """Concurrency limit adjusted with AIMD (additive increase, multiplicative decrease).
+
+    Used as a context manager around each request. The limit grows by one
+    after a full window of successful requests and halves when the
+    provider throttles us, settling just under the provider's limit."""
+
+    def __init__(self, limit, minimum=1, maximum=None):
+        self.limit = float(limit)
+        self.minimum = minimum
+        self.maximum = maximum or limit
+        self.active = 0
+        self._successes = 0
+        self._condition = threading.Condition()
+
+    def __enter__(self):
+        with self._condition:
+            while self.active >= int(self.limit):
+                self._condition.wait()
+            self.active += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify_all()
+        return False
+
+    def on_success(self):
+        with self._condition:
+            self._successes += 1
+            if self._successes >= int(self.limit) and self.limit < self.maximum:
+                self._successes = 0
+                self.limit = min(self.maximum, self.limit + 1)
+                self._condition.notify_all()
+
+    def on_throttle(self):
+        with self._condition:
+            self._successes = 0
+            self.limit = max(self.minimum, self.limit / 2)
+
+
+class AsyncAdaptiveConcurrency(AdaptiveConcurrency):
+    """AdaptiveConcurrency for coroutines on one event loop.
+
+    Used with `async with`; waiting for a slot suspends the coroutine instead
+    of blocking the thread. The AIMD adjustment is inherited."""
+
+    def __init__(self, limit, minimum=1, maximum=None):
+        # Imported here so the sync pipeline never pays for loading asyncio
+        import asyncio
+
+        super().__init__(limit, minimum, maximum)
+        self._released = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._released:
+            # The limit may have grown since the last release, so re-check it
+            await self._released.wait_for(lambda: self.active < int(self.limit))
+            self.active += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        async with self._released:
+            self.active -= 1
+            self._released.notify_all()
+        return False
+
+
+class RetryPolicy:
+    """Jittered exponential backoff that honours server-provided delays"""
+
+    def __init__(self, max_retries=5, base_delay=1.0, max_delay=60.0, retryable_exceptions=(ConnectionError, TimeoutError)):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable_exceptions = retryable_exceptions
+
+    def should_retry(self, error, attempt):
+        """True if a request failing with error should be retried"""
+        if attempt >= self.max_retries:
+            return False
+        status_code = getattr(error, 'status_code', None)
+        if status_code is not None:
+            return status_code in RETRYABLE_STATUS_CODES
+        # Connection resets and timeouts
+        return isinstance(error, self.retryable_exceptions)
+
+    def delay(self, attempt, retry_after=None):
+        """Seconds to wait before retry number attempt (starting at 1)"""
+        if retry_after is not None:
+            # Small jitter so throttled workers do not all retry at once
+            return retry_after + random.uniform(0, self.base_delay)
+        # "Full jitter": uniform between 0 and the exponential ceiling
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+def parse_retry_after(headers):
+    """Return the Retry-After header in seconds, or None"""
+    value = (headers or {}).get('Retry-After') or (headers or {}).get('retry-after')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        # HTTP-date form
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+
+class RenderManifest:
+    """Record of the story text and settings behind each output file.
+
+    Stored as manifest.json in the mentor's output directory so reruns can
+    skip stories whose text and settings have not changed."""
+
+    FILENAME = 'manifest.json'
+    VERSION = 1
+
+    def __init__(self, output_dir):
+        self.path = Path(output_dir) / self.FILENAME
+        self.files = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Load the manifest from disk, starting empty if missing or unreadable"""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable manifest {self.path}: {str(e)}")
+            return
+        if data.get('version') == self.VERSION:
+            self.files = data.get('files', {})
+
+    def save(self):
+        """Write the manifest atomically"""
+        with self._lock:
+            data = {'version': self.VERSION, 'files': dict(sorted(self.files.items()))}
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def fingerprint(text, settings):
+        """Hash a story's text together with the settings used to render it"""
+        payload = json.dumps({'text': text, 'settings': settings}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def is_current(self, file_path, fingerprint):
+        """True if file_path exists and was rendered from the same fingerprint"""
+        file_path = Path(file_path)
+        entry = self.files.get(file_path.name)
+        return bool(entry) and entry.get('hash') == fingerprint and file_path.exists()
+
+    def record(self, file_path, fingerprint):
+        """Note that file_path was rendered from fingerprint"""
+        with self._lock:
+            self.files[Path(file_path).name] = {'hash': fingerprint}
+
+    def remove_stale(self, current_names):
+        """Delete outputs recorded in the manifest that are no longer produced"""
+        removed = []
+        with self._lock:
+            for name in list(self.files):
+                if name in current_names:
+                    continue
+                stale_path = self.path.parent / name
+                if stale_path.exists():
+                    stale_path.unlink()
+                del self.files[name]
+                removed.append(name)
+        return removed
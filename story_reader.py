@@ -0,0 +1,56 @@
+import mmap
+import os
+
+# Buffer size for sequential reads of large input files
+READ_BUFFER_SIZE = 1024 * 1024
+
+
+def count_stories(file_path):
+    """Count the non-blank lines (stories) in a file"""
+    count = 0
+    for line in _iter_lines(file_path):
+        # Decoded, so Unicode whitespace such as U+00A0 counts as blank too
+        if line.decode('utf-8').strip():
+            count += 1
+    return count
+
+
+def _split_lines(lines):
+    """Split raw lines on lone carriage returns as well.
+
+    Binary reads only end lines at \\n, while text mode also ends them at
+    \\r. Pieces left over from \\r\\n endings are blank and get skipped."""
+    for line in lines:
+        if b'\r' in line:
+            yield from line.split(b'\r')
+        else:
+            yield line
+
+
+def _iter_lines(file_path, use_mmap=False):
+    """Yield raw lines of a file, optionally reading through mmap"""
+    if use_mmap and os.path.getsize(file_path) > 0:
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            # Pages are loaded on demand and can be dropped by the OS again
+            yield from _split_lines(iter(mapped.readline, b''))
+        return
+    with open(file_path, 'rb', buffering=READ_BUFFER_SIZE) as f:
+        yield from _split_lines(f)
+
+
+def iter_stories(file_path, start=1, use_mmap=False):
+    """Lazily yield (index, story) for each non-blank line of a file.
+
+    Indexes count stories from 1, as the output file names do, and
+    blank lines are skipped the way count_stories skips them. Only one
+    line is held in memory at a time, whatever the size of the file."""
+    index = 0
+    for line in _iter_lines(file_path, use_mmap):
+        # Each line in the file is a separate story
+        story = line.decode('utf-8').strip()
+        if not story:
+            continue
+        index += 1
+        if index < start:
+            continue
+        yield index, story
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+# Eviction trims the cache to this fraction of max_bytes, so the directory
+# is rescanned once per tenth of the cache stored rather than on every store
+EVICT_TO = 0.9
+
+
+class SynthesisCache:
+    """Content-addressed on-disk cache of synthesized MP3 audio.
+
+    Entries are keyed on the cleaned text plus everything that affects the
+    rendered audio (voice, model and voice settings). The cache is bounded by
+    total size and evicts the least recently used entries first. Entry sizes
+    and recency are kept in memory, so storing an entry does not touch the
+    rest of the cache directory."""
+
+    def __init__(self, cache_dir='.tts_cache', max_bytes=1024 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        # key -> size, least recently used first, and the sizes' total
+        self._entries = OrderedDict()
+        self._total = 0
+        self._scan()
+
+        # Run statistics reported in the processing summary
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    @staticmethod
+    def make_key(text, voice_id, model, stability, similarity_boost, style):
+        """Build the cache key for a synthesis request"""
+        payload = json.dumps({
+            'text': text,
+            'voice_id': voice_id,
+            'model': model,
+            'stability': stability,
+            'similarity_boost': similarity_boost,
+            'style': style
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _scan(self):
+        """Rebuild the index from the cache directory, ordered by mtime.
+        Picks up entries stored or removed by other processes."""
+        entries = []
+        for path in self.cache_dir.glob('*/*.mp3'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        self._entries = OrderedDict((key, size) for _, key, size in sorted(entries))
+        self._total = sum(self._entries.values())
+
+    def _touch(self, key, size):
+        """Record key as the most recently used entry. Call with the lock held."""
+        self._total += size - self._entries.pop(key, 0)
+        self._entries[key] = size
+
+    def _entry_path(self, key):
+        """Entries are sharded by the first two hex digits of the key"""
+        return self.cache_dir / key[:2] / f"{key}.mp3"
+
+    def fetch(self, key, destination):
+        """Place a cached entry at destination. Returns True on a hit."""
+        entry = self._entry_path(key)
+        try:
+            size = entry.stat().st_size
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return False
+
+        destination = Path(destination)
+        tmp_path = destination.with_name(destination.name + '.tmp')
+        try:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            try:
+                # Hardlink when possible so hits cost no extra disk space
+                os.link(entry, tmp_path)
+            except OSError:
+                shutil.copyfile(entry, tmp_path)
+            os.replace(tmp_path, destination)
+            # Refresh the access time used for LRU eviction
+            os.utime(entry)
+        except FileNotFoundError:
+            # Entry evicted between stat and link
+            with self._lock:
+                self.misses += 1
+            return False
+
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += size
+            self._touch(key, size)
+        return True
+
+    def store(self, key, source):
+        """Add the file at source to the cache and enforce the size bound"""
+        entry = self._entry_path(key)
+        entry.parent.mkdir(exist_ok=True)
+        tmp_path = entry.with_name(f"{entry.name}.{threading.get_ident()}.tmp")
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, entry)
+        with self._lock:
+            self._touch(key, entry.stat().st_size)
+            if self.max_bytes and self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Remove least recently used entries until the cache is back under
+        EVICT_TO of max_bytes. Call with the lock held."""
+        # Other processes may share the directory, so resync before deleting
+        self._scan()
+        while self._entries and self._total > self.max_bytes * EVICT_TO:
+            key, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                self._entry_path(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def reset_stats(self):
+        """Zero the run statistics, at the start of a new run"""
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def summary(self):
+        """Return a one-line description of cache activity for this run"""
+        saved_mb = self.bytes_saved / (1024 * 1024)
+        return f"Cache: {self.hits} hits, {self.misses} misses, {saved_mb:.2f} MB of audio reused"
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# The modules live at the top level of the repo, the fake servers in benchmarks/
+sys.path[:0] = [str(REPO_DIR), str(REPO_DIR / 'benchmarks')]
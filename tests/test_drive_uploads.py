@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+
+import pytest
+from google.auth.credentials import AnonymousCredentials
+from googleapiclient.http import HttpRequest
+
+from fake_services import FakeDriveServer
+from google_drive_manager import GoogleDriveManager
+
+CHUNK_SIZE = 256 * 1024
+FILE_SIZE = 4 * CHUNK_SIZE + 123
+
+
+class Interrupted(Exception):
+    """Stands in for the process dying mid-upload"""
+
+
+def fail_chunk(monkeypatch, number, error):
+    """Make next_chunk raise error on its number-th call, once"""
+    next_chunk = HttpRequest.next_chunk
+    calls = []
+
+    def flaky(self, *args, **kwargs):
+        calls.append(None)
+        if len(calls) == number:
+            raise error
+        return next_chunk(self, *args, **kwargs)
+
+    monkeypatch.setattr(HttpRequest, 'next_chunk', flaky)
+    return calls
+
+
+@pytest.fixture
+def drive():
+    with FakeDriveServer(latency=0, throughput=0) as server:
+        yield server
+
+
+@pytest.fixture
+def manager(drive, tmp_path):
+    manager = GoogleDriveManager(
+        chunk_size=CHUNK_SIZE,
+        sessions_path=tmp_path / 'sessions.json',
+        api_endpoint=drive.url,
+        folder_cache_path=None
+    )
+    manager.creds = AnonymousCredentials()
+    manager.service = manager._build_service()
+    manager._backoff = lambda attempt: None
+    return manager
+
+
+@pytest.fixture
+def audio(tmp_path):
+    path = tmp_path / 'story_01.mp3'
+    path.write_bytes(os.urandom(FILE_SIZE))
+    return path
+
+
+def assert_uploaded(drive, file_id, path):
+    data = path.read_bytes()
+    assert drive.files[file_id]['size'] == str(len(data))
+    assert drive.files[file_id]['md5Checksum'] == hashlib.md5(data).hexdigest()
+
+
+def saved_sessions(manager):
+    with open(manager.sessions_path) as f:
+        return json.load(f)
+
+
+def test_upload_in_chunks(drive, manager, audio):
+    file_id = manager.upload_to_folder(audio, 'root')
+
+    assert_uploaded(drive, file_id, audio)
+    assert drive.bytes_received == FILE_SIZE
+    assert saved_sessions(manager) == {}
+
+
+def test_resume_sends_only_missing_bytes(drive, manager, audio, monkeypatch):
+    fail_chunk(monkeypatch, 3, Interrupted())
+    with pytest.raises(Interrupted):
+        manager.upload_to_folder(audio, 'root')
+    assert drive.bytes_received == 2 * CHUNK_SIZE
+    assert str(audio.resolve()) in saved_sessions(manager)
+
+    monkeypatch.undo()
+    file_id = manager.upload_to_folder(audio, 'root')
+
+    # The 308 Range reply moved the upload on to the third chunk
+    assert_uploaded(drive, file_id, audio)
+    assert drive.bytes_received == FILE_SIZE
+    assert saved_sessions(manager) == {}
+
+
+def test_resume_of_completed_upload(drive, manager, audio, monkeypatch):
+    # The last chunk arrives but the process dies before seeing the reply
+    next_chunk = HttpRequest.next_chunk
+
+    def lose_last_reply(self, *args, **kwargs):
+        status, response = next_chunk(self, *args, **kwargs)
+        if response:
+            raise Interrupted()
+        return status, response
+
+    monkeypatch.setattr(HttpRequest, 'next_chunk', lose_last_reply)
+    with pytest.raises(Interrupted):
+        manager.upload_to_folder(audio, 'root')
+
+    monkeypatch.undo()
+    file_id = manager.upload_to_folder(audio, 'root')
+
+    assert_uploaded(drive, file_id, audio)
+    assert drive.bytes_received == FILE_SIZE
+    assert len(drive.files) == 1
+
+
+@pytest.mark.parametrize('expire', ['delete', 'gone'])
+def test_expired_session_restarts_upload(drive, manager, audio, monkeypatch, expire):
+    fail_chunk(monkeypatch, 3, Interrupted())
+    with pytest.raises(Interrupted):
+        manager.upload_to_folder(audio, 'root')
+    if expire == 'delete':
+        drive.sessions.clear()  # Unknown session: 404
+    else:
+        drive.expire_sessions()  # Expired session: 410
+
+    monkeypatch.undo()
+    file_id = manager.upload_to_folder(audio, 'root')
+
+    assert_uploaded(drive, file_id, audio)
+    assert drive.bytes_received == 2 * CHUNK_SIZE + FILE_SIZE
+    assert saved_sessions(manager) == {}
+
+
+def test_session_expiring_mid_upload_restarts(drive, manager, audio, monkeypatch):
+    next_chunk = HttpRequest.next_chunk
+    calls = []
+
+    def expire_after_two(self, *args, **kwargs):
+        calls.append(None)
+        if len(calls) == 3:
+            drive.expire_sessions()
+        return next_chunk(self, *args, **kwargs)
+
+    monkeypatch.setattr(HttpRequest, 'next_chunk', expire_after_two)
+    file_id = manager.upload_to_folder(audio, 'root')
+
+    assert_uploaded(drive, file_id, audio)
+    assert drive.bytes_received == 2 * CHUNK_SIZE + FILE_SIZE
+
+
+def test_connection_error_resumes(drive, manager, audio, monkeypatch, capsys):
+    fail_chunk(monkeypatch, 3, ConnectionResetError('Connection reset by peer'))
+    file_id = manager.upload_to_folder(audio, 'root')
+
+    assert_uploaded(drive, file_id, audio)
+    assert drive.bytes_received == FILE_SIZE
+    assert 'Connection reset by peer (attempt 1/5)' in capsys.readouterr().out
+
+
+def test_dropped_connection_mid_upload(drive, manager, audio, capsys):
+    drive.drop_chunks = 2
+    file_id = manager.upload_to_folder(audio, 'root')
+
+    # The server kept half of each dropped chunk; the client resumed from there
+    assert_uploaded(drive, file_id, audio)
+    assert drive.bytes_received == FILE_SIZE
+    assert drive.drop_chunks == 0
+    assert 'Retrying story_01.mp3 after' in capsys.readouterr().out
+
+
+def test_connection_errors_give_up_after_max_retries(drive, manager, audio):
+    manager.max_retries = 2
+    drive.drop_chunks = 100
+
+    with pytest.raises(ConnectionResetError):
+        manager.upload_to_folder(audio, 'root')
+    assert drive.drop_chunks == 100 - 3
+    assert drive.files == {}
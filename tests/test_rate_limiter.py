@@ -0,0 +1,129 @@
+import time
+
+import pytest
+
+from fake_services import FakeTTSServer, fake_mp3
+from rate_limiter import AdaptiveConcurrency, TokenBucket, parse_retry_after
+from text_to_speech import ElevenLabsManager, SynthesisError
+
+VOICE_ID = 'benchmarkvoice000001'
+
+
+def script(server, outcomes):
+    """Make the fake server answer with the given statuses, then 200s.
+    Returns the list of outcomes served, one per synthesis request."""
+    outcomes = iter(outcomes)
+    served = []
+
+    def next_outcome():
+        served.append(next(outcomes, 200))
+        return served[-1]
+
+    server.next_outcome = next_outcome
+    return served
+
+
+@pytest.fixture
+def tts():
+    with FakeTTSServer(latency=0, jitter=0, retry_after=0.3) as server:
+        yield server
+
+
+@pytest.fixture
+def manager(tts):
+    manager = ElevenLabsManager(api_key='test', api_base_url=tts.url, cache_dir=None, voices_cache_path=None, max_in_flight=4)
+    # Keep backoff jitter small, so timings come from Retry-After
+    manager.retry_policy.base_delay = 0.01
+    return manager
+
+
+def generate(manager, tmp_path, name='story'):
+    return manager.generate_audio('A short story.', voice_id=VOICE_ID, output_dir=tmp_path, output_filename=name)
+
+
+def test_429_is_retried_after_retry_after(tts, manager, tmp_path):
+    served = script(tts, [429])
+    started = time.monotonic()
+    path = generate(manager, tmp_path)
+    elapsed = time.monotonic() - started
+
+    assert served == [429, 200]
+    assert tmp_path.joinpath('story.mp3').exists() and path.endswith('story.mp3')
+    assert 0.3 <= elapsed < 1.0
+    assert (manager.throttled, manager.retries) == (1, 1)
+
+
+def test_concurrency_limit_halves_on_429_and_grows_back(tts, manager, tmp_path):
+    script(tts, [429])
+    generate(manager, tmp_path)
+    # Halved from 4 by the 429; its retry is the first success of the new window
+    assert manager._in_flight.limit == 2
+
+    limits = []
+    for index in range(6):
+        generate(manager, tmp_path, f"story_{index}")
+        limits.append(manager._in_flight.limit)
+    # One step up per full window of successes, capped at max_in_flight
+    assert limits == [3, 3, 3, 4, 4, 4]
+
+
+def test_client_error_is_not_retried(tts, manager, tmp_path):
+    served = script(tts, [400])
+    with pytest.raises(SynthesisError) as error:
+        generate(manager, tmp_path)
+
+    assert error.value.status_code == 400
+    assert served == [400]
+    assert manager.retries == 0
+    assert not tmp_path.joinpath('story.mp3').exists()
+
+
+def test_server_errors_are_retried_with_backoff(tts, manager, tmp_path):
+    served = script(tts, [500, 503])
+    generate(manager, tmp_path)
+
+    assert served == [500, 503, 200]
+    assert (manager.throttled, manager.retries) == (0, 2)
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_truncated_body_is_retried(tts, manager, tmp_path, stream):
+    served = script(tts, ['truncated'])
+    path = manager.generate_audio('A short story.', voice_id=VOICE_ID, output_dir=tmp_path, output_filename='story', stream=stream)
+
+    assert served == ['truncated', 200]
+    assert manager.retries == 1
+    # The retry rewrote the whole file, not just the missing half
+    assert tmp_path.joinpath('story.mp3').stat().st_size == len(fake_mp3(len('A short story.') * tts.seconds_per_char))
+    assert path.endswith('story.mp3')
+
+
+def test_on_throttle_respects_minimum():
+    limiter = AdaptiveConcurrency(4, minimum=1)
+    for _ in range(5):
+        limiter.on_throttle()
+    assert limiter.limit == 1
+
+
+def test_token_bucket_pause_holds_tokens():
+    bucket = TokenBucket(rate=100)
+    assert bucket.try_acquire() == 0
+    bucket.pause(0.5)
+    assert 0.4 < bucket.try_acquire() <= 0.5
+
+
+@pytest.mark.parametrize('headers, expected', [
+    ({'Retry-After': '2'}, 2.0),
+    ({'retry-after': '0.5'}, 0.5),
+    ({'Retry-After': '-3'}, 0.0),
+    ({'Retry-After': 'soon'}, None),
+    ({}, None),
+    (None, None),
+])
+def test_parse_retry_after_seconds(headers, expected):
+    assert parse_retry_after(headers) == expected
+
+
+def test_parse_retry_after_http_date():
+    date = time.strftime('%a, %d %b %Y %H:%M:%S GMT', time.gmtime(time.time() + 30))
+    assert 28 <= parse_retry_after({'Retry-After': date}) <= 30
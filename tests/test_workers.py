@@ -0,0 +1,70 @@
+import random
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from text_to_speech import ElevenLabsManager
+
+STORIES = [f"Story number {number} about the mentor." for number in range(1, 13)]
+
+
+class SlowStub:
+    """generate_fn/save_fn pair with random latency, so workers finish out of order"""
+
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.finished = []
+
+    def generate(self, text, voice, model, **kwargs):
+        with self.lock:
+            delay = self.random.uniform(0, 0.05)
+        time.sleep(delay)
+        with self.lock:
+            self.finished.append(text)
+        return text.encode('utf-8')
+
+    def save(self, audio, path):
+        with open(path, 'wb') as f:
+            f.write(audio)
+
+
+@pytest.fixture
+def story_file(tmp_path, monkeypatch):
+    # Output goes to audio_files/ under the working directory
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / 'mentor.txt'
+    path.write_text('\n\n'.join(STORIES) + '\n', encoding='utf-8')
+    return path
+
+
+def run(story_file, workers, seed=0):
+    stub = SlowStub(seed)
+    manager = ElevenLabsManager(api_key='test', generate_fn=stub.generate, save_fn=stub.save, cache_dir=None, voices_cache_path=None)
+    paths = manager.process_text_file(story_file, voice_id='stubvoice', upload_to_drive=False, workers=workers)
+    return stub, [Path(path) for path in paths]
+
+
+@pytest.mark.parametrize('workers', [1, 4, 8])
+def test_workers_keep_names_and_order(story_file, workers):
+    stub, paths = run(story_file, workers)
+
+    assert [path.name for path in paths] == [f"mentor_{number:02d}.mp3" for number in range(1, len(STORIES) + 1)]
+    # Each file holds its own story, whichever worker wrote it
+    assert [path.read_bytes().decode('utf-8') for path in paths] == STORIES
+    if workers > 1:
+        # The stub's latency did make stories finish out of order
+        assert stub.finished != STORIES
+
+
+def test_workers_match_sequential_run(story_file):
+    _, sequential = run(story_file, 1)
+    sequential = [(path.name, path.read_bytes()) for path in sequential]
+    for path in story_file.parent.glob('audio_files/mentor/*.mp3'):
+        path.unlink()
+
+    _, concurrent = run(story_file, 6, seed=1)
+
+    assert [(path.name, path.read_bytes()) for path in concurrent] == sequential
@@ -0,0 +1,123 @@
+import re
+from collections import namedtuple
+
+# Sentence boundary: whitespace following sentence-final punctuation
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+
+# Newline and paragraph break as written in the input files: literal "\n" / "\n\n"
+LITERAL_NEWLINE = '\\n'
+PARAGRAPH_BREAK = '\\n\\n'
+
+NormalizedText = namedtuple('NormalizedText', ['text', 'question'])
+
+# Per-request character limits of the ElevenLabs models
+MODEL_CHAR_LIMITS = {
+    'eleven_multilingual_v2': 10000,
+    'eleven_multilingual_v1': 5000,
+    'eleven_monolingual_v1': 5000,
+    'eleven_turbo_v2': 30000,
+}
+DEFAULT_CHAR_LIMIT = 5000
+
+
+def fold_whitespace(text):
+    """Turn literal newlines into spaces and collapse all whitespace runs.
+    str.split() does the collapsing in C, several times faster than a regex."""
+    return ' '.join(text.replace(LITERAL_NEWLINE, ' ').split())
+
+
+class TextNormalizer:
+    """Cleans story text for synthesis.
+
+    Literal and real newlines are folded and whitespace collapsed in one
+    pass over the text. A closing question in the story's last paragraph is
+    detected and prefixed with "; ", which gives it a rising intonation."""
+
+    def normalize(self, text):
+        """Return NormalizedText(text, question); question is None if absent"""
+        cleaned = fold_whitespace(text)
+
+        # The question is in the last part after the final \n\n
+        split_at = text.rfind(PARAGRAPH_BREAK)
+        if split_at == -1:
+            return NormalizedText(cleaned, None)
+        last_part = text[split_at + len(PARAGRAPH_BREAK):]
+        if '?' not in last_part:
+            return NormalizedText(cleaned, None)
+
+        # Get the last sentence that ends with a question mark
+        question = None
+        for sentence in reversed(SENTENCE_SPLIT.split(fold_whitespace(last_part))):
+            if sentence.endswith('?'):
+                question = sentence
+                break
+        if not question:
+            return NormalizedText(cleaned, None)
+
+        # Only format the final occurrence, not earlier identical sentences
+        position = cleaned.rfind(question)
+        if position == -1:
+            return NormalizedText(cleaned, None)
+        return NormalizedText(f"{cleaned[:position]}; {cleaned[position:]}", question)
+
+    def normalize_lines(self, lines):
+        """Normalize many stories, e.g. all lines of a file"""
+        normalize = self.normalize
+        return [normalize(line) for line in lines]
+
+
+# Shared instance; the normalizer keeps no per-call state
+normalizer = TextNormalizer()
+
+
+def char_limit_for_model(model):
+    """Return the per-request character limit for a model"""
+    return MODEL_CHAR_LIMITS.get(model, DEFAULT_CHAR_LIMIT)
+
+
+def split_text(text, max_chars):
+    """Split text into chunks of at most max_chars, breaking between sentences.
+
+    Sentences longer than max_chars are broken between words, and only
+    words longer than max_chars are cut mid-word."""
+    if len(text) <= max_chars:
+        return [text]
+
+    chunks = []
+    current = ''
+    for sentence in SENTENCE_SPLIT.split(text):
+        pieces = [sentence] if len(sentence) <= max_chars else _split_words(sentence, max_chars)
+        for piece in pieces:
+            if not current:
+                current = piece
+            elif len(current) + 1 + len(piece) <= max_chars:
+                current = f"{current} {piece}"
+            else:
+                chunks.append(current)
+                current = piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split_words(sentence, max_chars):
+    """Break an overlong sentence into pieces of at most max_chars"""
+    pieces = []
+    current = ''
+    for word in sentence.split():
+        while len(word) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ''
+            pieces.append(word[:max_chars])
+            word = word[max_chars:]
+        if not current:
+            current = word
+        elif len(current) + 1 + len(word) <= max_chars:
+            current = f"{current} {word}"
+        else:
+            pieces.append(current)
+            current = word
+    if current:
+        pieces.append(current)
+    return pieces
@@ -1,236 +1,1180 @@
-from elevenlabs import (
-    generate,
-    play,
-    save,
-    set_api_key,
-    voices,
-    Voice,
-    VoiceSettings,
-)
 import os
 import argparse
 import json
 from pathlib import Path
 from dotenv import load_dotenv
-import re
-from google_drive_manager import GoogleDriveManager
+from synthesis_cache import SynthesisCache
+from voice_registry import VoiceInfo, VoiceRegistry
+from render_manifest import RenderManifest
+from upload_pipeline import UploadPipeline
+from text_processing import char_limit_for_model, normalizer, split_text
+from mp3_utils import concat_mp3
+from audio_bundle import SUFFIX as BUNDLE_SUFFIX, write_bundle
+from story_reader import count_stories, iter_stories
+from metrics import Metrics
+from job_journal import JobJournal, PENDING, SYNTHESIZING, SAVED, UPLOADED, FAILED
+from rate_limiter import AdaptiveConcurrency, AsyncAdaptiveConcurrency, RetryPolicy, TokenBucket, parse_retry_after
 import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import product, zip_longest
+from collections import deque
+import glob
+import re
+import shutil
+from contextlib import nullcontext
+
+# Bytes requested per chunk when streaming synthesis responses to disk
+STREAM_CHUNK_SIZE = 16 * 1024
 
-# Load environment variables
-load_dotenv()
+# (connect, read) timeouts for ElevenLabs requests, in seconds
+HTTP_TIMEOUT = (10, 300)
+
+class SynthesisError(Exception):
+    """A text-to-speech request failed with an HTTP error status"""
+
+    def __init__(self, status_code, message, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        super().__init__(f"HTTP {status_code}: {message}")
 
 class ElevenLabsManager:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, max_in_flight=None, generate_fn=None, save_fn=None, cache_dir='.tts_cache', cache_max_bytes=1024 * 1024 * 1024, voices_cache_path='.voices_cache.json', segment_workers=4, requests_per_second=None, max_retries=5, api_base_url=None, pool_size=None, http2=False, metrics=None, post_processor=None):
         """Initialize the ElevenLabs Manager with API key and default settings"""
+        if not api_key and not os.getenv('ELEVEN_LABS_API_KEY'):
+            # Load environment variables
+            load_dotenv()
         self.api_key = api_key or os.getenv('ELEVEN_LABS_API_KEY')
         if not self.api_key:
             raise ValueError("API key is required. Set ELEVEN_LABS_API_KEY environment variable or pass it directly.")
 
-        set_api_key(self.api_key)
+        # The ElevenLabs, requests and Google client libraries are imported
+        # on first use: they dominate startup, and runs that only reuse
+        # cached audio or list cached voices never need them
+        self._elevenlabs_ready = False
         self.base_dir = Path('audio_files')
         self.base_dir.mkdir(exist_ok=True)
 
+        self.api_base_url = api_base_url or os.getenv('ELEVEN_BASE_URL', 'https://api.elevenlabs.io/v1')
+
+        # Synthesis and save hooks (overridable so batches can run against stubs)
+        self.generate_fn = generate_fn or self._http_generate
+        self.save_fn = save_fn or self._save
+
+        # Cap the number of concurrent ElevenLabs requests across all workers.
+        # The cap adapts: it halves when throttled and creeps back up to max_in_flight.
+        self.max_in_flight = max_in_flight
+        self._in_flight = AdaptiveConcurrency(max_in_flight) if max_in_flight else None
+        self.rate_limiter = TokenBucket(requests_per_second) if requests_per_second else None
+
+        # Keep-alive connection pool shared by all workers, so each request
+        # reuses an open TLS connection instead of paying a new handshake
+        self.pool_size = pool_size or max_in_flight or 10
+        self.http2_client = None
+        retryable_exceptions = (ConnectionError, TimeoutError)
+        if http2:
+            try:
+                import httpx
+            except ImportError:
+                raise ValueError("HTTP/2 support requires httpx: pip install 'httpx[http2]'")
+            limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            self.http2_client = httpx.Client(http2=True, limits=limits, timeout=httpx.Timeout(HTTP_TIMEOUT[1], connect=HTTP_TIMEOUT[0]))
+            retryable_exceptions += (httpx.TransportError,)
+        self.session = None
+        self._session_lock = threading.Lock()
+
+        self.retry_policy = RetryPolicy(max_retries=max_retries, retryable_exceptions=retryable_exceptions)
+
+        # API usage for the run summary
+        self._stats_lock = threading.Lock()
+        self.retries = 0
+        self.throttled = 0
+        self.characters_billed = 0
+
+        # State of the async API, bound to the event loop it was created on
+        self._async_loop = None
+        self._async_client = None
+        self._async_in_flight = None
+        self._warned_no_httpx = False
+
+        # Per-stage latency histograms and counters (see --profile, --metrics-file)
+        self.metrics = metrics or Metrics()
+
+        # Optional trimming and loudness normalisation of saved files (post_processing.PostProcessor)
+        self.post_processor = post_processor
+
+        # Parallel requests per story when a long story is split into segments
+        self.segment_workers = segment_workers
+
+        # Voice catalogue, fetched once per process and cached on disk between runs
+        self.voice_registry = VoiceRegistry(self._http_voices, cache_path=voices_cache_path, api_key=self.api_key)
+
+        # Content-addressed cache of synthesized audio (disabled with cache_dir=None)
+        self.cache = SynthesisCache(cache_dir, cache_max_bytes) if cache_dir else None
+
         # Initialize Google Drive manager but don't authenticate yet
         self.drive_manager = None
 
     def init_drive_manager(self):
         """Initialize and authenticate Google Drive manager when needed"""
         if self.drive_manager is None:
+            from google_drive_manager import GoogleDriveManager
             self.drive_manager = GoogleDriveManager()
             if not self.drive_manager.authenticate():
                 print("\nFailed to authenticate with Google Drive. Files will be saved locally only.")
                 return False
         return True
 
-    def list_available_voices(self):
+    def list_available_voices(self, refresh=False):
         """Get all available voices"""
         try:
-            all_voices = voices()
-            return all_voices
+            if refresh:
+                return self.voice_registry.refresh()
+            return self.voice_registry.voices()
         except Exception as e:
             print(f"Error fetching voices: {str(e)}")
             return []
 
     def find_voice_by_name(self, voice_name):
         """Find a voice by its name"""
-        all_voices = self.list_available_voices()
-        for voice in all_voices:
-            if voice.name.lower() == voice_name.lower():
-                return voice
-        return None
+        try:
+            return self.voice_registry.find(voice_name)
+        except Exception as e:
+            print(f"Error fetching voices: {str(e)}")
+            return None
+
+    def _request_slot(self):
+        """Context manager holding one of the max_in_flight request slots"""
+        return self._in_flight if self._in_flight else nullcontext()
+
+    def _note_quota_headers(self, headers):
+        """Track characters billed and back off when the reported quota runs out"""
+        cost = headers.get('character-cost')
+        if cost and cost.isdigit():
+            with self._stats_lock:
+                self.characters_billed += int(cost)
+            self.metrics.increment('characters_billed', int(cost))
+        remaining = headers.get('x-ratelimit-remaining')
+        reset = parse_retry_after({'Retry-After': headers.get('x-ratelimit-reset')})
+        if remaining == '0' and reset and self.rate_limiter:
+            self.rate_limiter.pause(reset)
 
-    def generate_audio(self, text, voice_name=None, voice_id=None, output_filename=None, output_dir=None, model="eleven_multilingual_v2", stability=0.5, similarity_boost=0.75, style=0.0):
-        """Generate audio from text using specified voice and settings"""
+    def _http_session(self):
+        """Return the pooled requests session, creating it on first use"""
+        if self.session is None:
+            with self._session_lock:
+                if self.session is None:
+                    import requests
+                    session = requests.Session()
+                    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    session.headers.update({'xi-api-key': self.api_key})
+                    # A body cut off mid-transfer surfaces as ChunkedEncodingError
+                    self.retry_policy.retryable_exceptions += (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+                    self.session = session
+        return self.session
+
+    def _save(self, audio, path):
+        """Default save_fn: elevenlabs.save"""
+        from elevenlabs import save
+        save(audio, path)
+
+    def _voice(self, voice_id, stability, similarity_boost, style):
+        """Build the elevenlabs Voice for a request, importing the library on first use"""
+        from elevenlabs import Voice, VoiceSettings, set_api_key
+        if not self._elevenlabs_ready:
+            # For library helpers used as generate_fn, e.g. elevenlabs.generate
+            set_api_key(self.api_key)
+            self._elevenlabs_ready = True
+        return Voice(
+            voice_id=voice_id,
+            settings=VoiceSettings(stability=stability, similarity_boost=similarity_boost, style=style)
+        )
+
+    def _http_request(self, method, url, stream=False, **kwargs):
+        """Send a request over the pooled connection (HTTP/2 when enabled).
+        Returns (status_code, headers, response) where response is the
+        requests or httpx response object."""
+        if self.http2_client:
+            request = self.http2_client.build_request(method, url, headers={'xi-api-key': self.api_key}, **kwargs)
+            response = self.http2_client.send(request, stream=stream)
+            if stream and response.status_code != 200:
+                response.read()
+            return response.status_code, response.headers, response
+        response = self._http_session().request(method, url, stream=stream, timeout=HTTP_TIMEOUT, **kwargs)
+        return response.status_code, response.headers, response
+
+    def _iter_response(self, response, chunk_size):
+        """Yield the body of a streamed response in chunks, then release the connection"""
         try:
-            # First identify the question at the end before cleaning newlines
-            original_text = text
-
-            # The question is in the last part after the final \n\n
-            parts = original_text.split("\\n\\n")
-            if len(parts) > 1:
-                last_part = parts[-1].strip()
-                # Find the question in the last part
-                if "?" in last_part:
-                    # Get the sentence that ends with a question mark
-                    sentences = re.split(r'(?<=[.!?])\s+', last_part)
-                    for sentence in reversed(sentences):
-                        if sentence.strip().endswith("?"):
-                            question = sentence.strip()
-                            # Remember the question for later formatting
-                            question_to_format = question
-                            break
-
-            # Now clean the text of newlines
-            text = text.replace("\\n\\n", " ")  # Replace literal \n\n string
-            text = text.replace("\\n", " ")     # Replace literal \n string
-            text = text.replace("\n\n", " ")    # Replace actual double newlines
-            text = text.replace("\n", " ")      # Replace actual single newlines
-            text = re.sub(r'\s+', ' ', text)    # Replace multiple spaces with a single space
-            text = text.strip()                 # Remove leading/trailing whitespace
-
-            # Format the identified question
-            if 'question_to_format' in locals() and question_to_format in text:
-                # Add sentence-final punctuation to enhance rising intonation
-                formatted_question = f'; {question_to_format}'  # Semi-colon creates a pause and helps with rising intonation
-
-                # Replace the question in the cleaned text
-                text = text.replace(question_to_format, formatted_question)
-
-                # Use a slightly lower stability for the entire text to allow more expressiveness
-                stability = 0.4  # Balance between consistency and expressiveness
-
-                # Use higher similarity boost to maintain voice characteristics
-                similarity_boost = 0.85
-
-            # Create voice settings
-            voice_settings = VoiceSettings(
-                stability=stability,
-                similarity_boost=similarity_boost,
-                style=style
+            if self.http2_client:
+                chunks = response.iter_bytes(chunk_size=chunk_size)
+            else:
+                chunks = response.iter_content(chunk_size=chunk_size)
+            for chunk in chunks:
+                if chunk:
+                    yield chunk
+        finally:
+            response.close()
+
+    def _http_voices(self):
+        """Fetch the voice catalogue over the pooled connection"""
+        status_code, headers, response = self._http_request('GET', f"{self.api_base_url}/voices")
+        if status_code != 200:
+            raise SynthesisError(status_code, response.text, headers)
+        return [
+            VoiceInfo(
+                name=voice.get('name'),
+                voice_id=voice.get('voice_id'),
+                category=voice.get('category'),
+                description=voice.get('description')
             )
+            for voice in response.json().get('voices', [])
+        ]
 
-            # Determine which voice to use
-            if voice_id:
-                # Use voice ID with custom settings
-                selected_voice = Voice(voice_id=voice_id, settings=voice_settings)
-            elif voice_name:
-                # Find voice by name and create with custom settings
-                voice = self.find_voice_by_name(voice_name)
-                if voice:
-                    selected_voice = Voice(voice_id=voice.voice_id, settings=voice_settings)
-                else:
-                    raise ValueError(f"Voice '{voice_name}' not found")
-            else:
-                # Use the first available voice if none specified
-                available_voices = self.list_available_voices()
-                if not available_voices:
-                    raise ValueError("No voices available")
-                selected_voice = Voice(voice_id=available_voices[0].voice_id, settings=voice_settings)
+    def _tts_request(self, text, voice, model, stream=False):
+        """Return the URL and JSON body of a text-to-speech request"""
+        url = f"{self.api_base_url}/text-to-speech/{voice.voice_id}" + ('/stream' if stream else '')
+        data = {
+            'text': text,
+            'model_id': model,
+            'voice_settings': voice.settings.model_dump() if voice.settings else None
+        }
+        return url, data
+
+    def _http_generate(self, text, voice, model, stream=False, stream_chunk_size=STREAM_CHUNK_SIZE, output_format='mp3_44100_128'):
+        """Call the text-to-speech endpoint directly, mirroring elevenlabs.generate.
+        Unlike the library helper this keeps the response status and headers,
+        which the retry logic needs (Retry-After, quota headers), and reuses
+        pooled keep-alive connections."""
+        url, data = self._tts_request(text, voice, model, stream)
+        status_code, headers, response = self._http_request(
+            'POST',
+            url,
+            stream=stream,
+            json=data,
+            params={'output_format': output_format}
+        )
+        if status_code != 200:
+            raise SynthesisError(status_code, response.text, headers)
+        self._note_quota_headers(headers)
+        if stream:
+            return self._iter_response(response, stream_chunk_size)
+        return response.content
+
+    def _call_api(self, request):
+        """Run request() under the rate limiter and concurrency limit,
+        retrying throttled and transient failures with jittered backoff"""
+        retries = 0
+        while True:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            try:
+                with self._request_slot(), self.metrics.timer('api_request'):
+                    result = request()
+            except Exception as e:
+                delay = self._retry_delay(e, retries, self._in_flight)
+                if delay is None:
+                    raise
+                retries += 1
+                time.sleep(delay)
+                continue
+            if self._in_flight:
+                self._in_flight.on_success()
+            return result
+
+    def _retry_delay(self, error, retries, in_flight):
+        """Account for a failed request and return the delay before retrying it,
+        or None if it should not be retried"""
+        if not self.retry_policy.should_retry(error, retries):
+            return None
+        attempt = retries + 1
+        retry_after = parse_retry_after(getattr(error, 'headers', None))
+        if getattr(error, 'status_code', None) == 429:
+            # Throttled: shrink concurrency and hold off new requests
+            with self._stats_lock:
+                self.throttled += 1
+            self.metrics.increment('throttled')
+            if in_flight:
+                in_flight.on_throttle()
+            if retry_after and self.rate_limiter:
+                self.rate_limiter.pause(retry_after)
+        delay = self.retry_policy.delay(attempt, retry_after)
+        with self._stats_lock:
+            self.retries += 1
+        self.metrics.increment('retries')
+        print(f"Retrying request after error ({str(error)}) in {delay:.1f}s (attempt {attempt}/{self.retry_policy.max_retries})")
+        return delay
 
+    def _generate_segment(self, text, voice, model):
+        """Synthesize one segment of a long story and return its audio"""
+        return self._call_api(lambda: self.generate_fn(text=text, voice=voice, model=model))
+
+    def _synthesize_to_file(self, text, voice, model, path, stream=False, stream_chunk_size=STREAM_CHUNK_SIZE, max_chars=None):
+        """Call the API and write the resulting audio to path.
+        Text longer than max_chars is split at sentence boundaries, the
+        segments are synthesized in parallel and their MP3 frames joined."""
+        segments = split_text(text, max_chars or char_limit_for_model(model))
+        if len(segments) > 1:
+            print(f"Splitting {len(text)} characters into {len(segments)} segments")
+            with ThreadPoolExecutor(max_workers=min(self.segment_workers, len(segments))) as executor:
+                parts = list(executor.map(lambda segment: self._generate_segment(segment, voice, model), segments))
+            with self.metrics.timer('disk_save'):
+                self.save_fn(concat_mp3(parts), str(path))
+            return
+
+        if not stream:
             # Generate the audio with custom voice settings
-            audio = generate(
-                text=text,
-                voice=selected_voice,
-                model=model
-            )
+            audio = self._generate_segment(text, voice, model)
+            with self.metrics.timer('disk_save'):
+                self.save_fn(audio, str(path))
+            return
 
-            # Determine output directory
-            if output_dir:
-                output_path = Path(output_dir)
-            else:
-                output_path = self.base_dir
-            output_path.mkdir(exist_ok=True)
-
-            # Save the audio file
-            if output_filename:
-                # Ensure filename is lowercase
-                output_filename = output_filename.lower()
-                final_path = output_path / f"{output_filename}.mp3"
+        # Write chunks as they arrive; memory use is bounded by the chunk size.
+        # Streamed responses stay in flight until fully consumed, and a retry
+        # rewrites the file from the start.
+        def stream_to_file():
+            chunks = self.generate_fn(text=text, voice=voice, model=model, stream=True, stream_chunk_size=stream_chunk_size)
+            with open(path, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+
+        try:
+            self._call_api(stream_to_file)
+        except Exception:
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+
+    def _async_state(self):
+        """Return (client, in_flight) for the running event loop.
+
+        client is an httpx.AsyncClient, or None when httpx is not installed or
+        a custom generate_fn is set; the async API then runs the sync calls in
+        threads. in_flight is the loop's share of the max_in_flight limit."""
+        # The async methods import asyncio themselves, so the sync pipeline
+        # never pays for loading it
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            # asyncio primitives and clients cannot be shared between loops
+            self._async_loop = loop
+            self._async_in_flight = AsyncAdaptiveConcurrency(self.max_in_flight) if self.max_in_flight else None
+            self._async_client = None
+            if self.generate_fn == self._http_generate:
+                try:
+                    import httpx
+                except ImportError:
+                    httpx = None
+                    if not self._warned_no_httpx:
+                        print("Warning: httpx is not installed; async requests run in worker threads (pip install httpx)")
+                        self._warned_no_httpx = True
+                if httpx:
+                    limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+                    self._async_client = httpx.AsyncClient(
+                        http2=self.http2_client is not None,
+                        limits=limits,
+                        timeout=httpx.Timeout(HTTP_TIMEOUT[1], connect=HTTP_TIMEOUT[0]),
+                        headers={'xi-api-key': self.api_key}
+                    )
+                    if httpx.TransportError not in self.retry_policy.retryable_exceptions:
+                        self.retry_policy.retryable_exceptions += (httpx.TransportError,)
+        return self._async_client, self._async_in_flight
+
+    async def aclose(self):
+        """Close the async HTTP client of the running event loop"""
+        if self._async_client:
+            await self._async_client.aclose()
+        self._async_loop = self._async_client = self._async_in_flight = None
+
+    async def _acall_api(self, request):
+        """Async counterpart of _call_api: await request() under the shared
+        rate limiter and the loop's concurrency limit, with the same retries"""
+        import asyncio
+
+        _, in_flight = self._async_state()
+        retries = 0
+        while True:
+            if self.rate_limiter:
+                await self.rate_limiter.acquire_async()
+            try:
+                with self.metrics.timer('api_request'):
+                    if in_flight:
+                        async with in_flight:
+                            result = await request()
+                    else:
+                        result = await request()
+            except Exception as e:
+                delay = self._retry_delay(e, retries, in_flight)
+                if delay is None:
+                    raise
+                retries += 1
+                await asyncio.sleep(delay)
+                continue
+            if in_flight:
+                in_flight.on_success()
+            return result
+
+    async def _ahttp_generate(self, client, text, voice, model, path=None, stream_chunk_size=STREAM_CHUNK_SIZE, output_format='mp3_44100_128'):
+        """Async counterpart of _http_generate. With path the audio is
+        streamed into that file; otherwise it is returned. File I/O runs in
+        a thread so a slow disk does not stall the event loop."""
+        import asyncio
+
+        url, data = self._tts_request(text, voice, model, stream=path is not None)
+        async with client.stream('POST', url, json=data, params={'output_format': output_format}) as response:
+            if response.status_code != 200:
+                await response.aread()
+                raise SynthesisError(response.status_code, response.text, response.headers)
+            self._note_quota_headers(response.headers)
+            if path is None:
+                return await response.aread()
+            f = await asyncio.to_thread(open, path, 'wb')
+            try:
+                async for chunk in response.aiter_bytes(chunk_size=stream_chunk_size):
+                    await asyncio.to_thread(f.write, chunk)
+            finally:
+                await asyncio.to_thread(f.close)
+
+    async def _asynthesize_to_file(self, text, voice, model, path, stream=False, stream_chunk_size=STREAM_CHUNK_SIZE, max_chars=None):
+        """Async counterpart of _synthesize_to_file"""
+        import asyncio
+
+        client, _ = self._async_state()
+        if client is None:
+            await asyncio.to_thread(self._synthesize_to_file, text, voice, model, path, stream, stream_chunk_size, max_chars)
+            return
+
+        segments = split_text(text, max_chars or char_limit_for_model(model))
+        if len(segments) > 1:
+            print(f"Splitting {len(text)} characters into {len(segments)} segments")
+            segment_slots = asyncio.Semaphore(self.segment_workers)
+
+            async def generate_segment(segment):
+                async with segment_slots:
+                    return await self._acall_api(lambda: self._ahttp_generate(client, segment, voice, model))
+
+            parts = await asyncio.gather(*(generate_segment(segment) for segment in segments))
+            with self.metrics.timer('disk_save'):
+                await asyncio.to_thread(self.save_fn, concat_mp3(parts), str(path))
+            return
+
+        if not stream:
+            audio = await self._acall_api(lambda: self._ahttp_generate(client, text, voice, model))
+            with self.metrics.timer('disk_save'):
+                await asyncio.to_thread(self.save_fn, audio, str(path))
+            return
+
+        try:
+            await self._acall_api(lambda: self._ahttp_generate(client, text, voice, model, path, stream_chunk_size))
+        except Exception:
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+
+    def _prepare_request(self, text, voice_name, voice_id, output_filename, output_dir, model, stability, similarity_boost, style, normalized=None, force=False, exact_settings=False):
+        """Clean the text, resolve the voice and output path, and try the cache.
+        Returns (text, voice, final_path, cache_key, cached); voice is None
+        on a cache hit. With force the cache is not read, only refreshed.
+        With exact_settings the closing question does not change the voice
+        settings."""
+        # Fold newlines and whitespace, and mark the closing question
+        if normalized is None:
+            normalized = normalizer.normalize(text)
+        text = normalized.text
+
+        if normalized.question and not exact_settings:
+            # Use a slightly lower stability for the entire text to allow more expressiveness
+            stability = 0.4  # Balance between consistency and expressiveness
+
+            # Use higher similarity boost to maintain voice characteristics
+            similarity_boost = 0.85
+
+        # Determine which voice to use
+        voice_lookup_started = time.perf_counter()
+        if voice_id:
+            selected_voice_id = voice_id
+        elif voice_name:
+            # Find voice by name
+            voice = self.find_voice_by_name(voice_name)
+            if voice:
+                selected_voice_id = voice.voice_id
             else:
-                final_path = output_path / "output.mp3"
+                raise ValueError(f"Voice '{voice_name}' not found")
+        else:
+            # Use the first available voice if none specified
+            available_voices = self.list_available_voices()
+            if not available_voices:
+                raise ValueError("No voices available")
+            selected_voice_id = available_voices[0].voice_id
+        self.metrics.observe('voice_lookup', time.perf_counter() - voice_lookup_started)
+
+        # Determine output directory
+        if output_dir:
+            output_path = Path(output_dir)
+        else:
+            output_path = self.base_dir
+        output_path.mkdir(exist_ok=True)
 
-            save(audio, str(final_path))
-            print(f"Created: {final_path}")
+        # Save the audio file
+        if output_filename:
+            # Ensure filename is lowercase
+            output_filename = output_filename.lower()
+            final_path = output_path / f"{output_filename}.mp3"
+        else:
+            final_path = output_path / "output.mp3"
 
+        # Reuse previously synthesized audio for identical requests
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.make_key(text, selected_voice_id, model, stability, similarity_boost, style)
+        if cache_key and not force:
+            with self.metrics.timer('cache_fetch'):
+                hit = self.cache.fetch(cache_key, final_path)
+            if hit:
+                self.metrics.increment('cache_hits')
+                print(f"Cached: {final_path}")
+                return text, None, final_path, cache_key, True
+            self.metrics.increment('cache_misses')
+
+        # Voice with custom settings
+        selected_voice = self._voice(selected_voice_id, stability, similarity_boost, style)
+        return text, selected_voice, final_path, cache_key, False
+
+    def _store_output(self, tmp_path, final_path, text, cache_key):
+        """Move freshly synthesized audio into place and add it to the cache"""
+        self.metrics.increment('characters_synthesized', len(text))
+        self.metrics.increment('bytes_written', tmp_path.stat().st_size)
+
+        # Write to a temporary file and rename, so a cached hardlink of a
+        # previous version of this file is never truncated in place
+        os.replace(tmp_path, final_path)
+        print(f"Created: {final_path}")
+
+        if cache_key:
+            self.cache.store(cache_key, final_path)
+
+    def generate_audio(self, text, voice_name=None, voice_id=None, output_filename=None, output_dir=None, model="eleven_multilingual_v2", stability=0.5, similarity_boost=0.75, style=0.0, stream=False, stream_chunk_size=STREAM_CHUNK_SIZE, max_chars=None, normalized=None, force=False, exact_settings=False):
+        """Generate audio from text using specified voice and settings.
+        With stream=True the response is written to disk chunk by chunk.
+        Text longer than max_chars (default: the model's limit) is synthesized
+        in segments and joined into a single file. normalized is the text's
+        normalizer.normalize() result, if the caller already has it. With
+        force the audio is synthesized again even if it is in the cache.
+        Stories ending in a question are read with stability 0.4 and
+        similarity_boost 0.85, unless exact_settings is set."""
+        try:
+            text, selected_voice, final_path, cache_key, cached = self._prepare_request(
+                text, voice_name, voice_id, output_filename, output_dir, model, stability, similarity_boost, style, normalized, force, exact_settings
+            )
+            if cached:
+                return str(final_path)
+
+            tmp_path = final_path.with_name(final_path.name + '.tmp')
+            with self.metrics.timer('synthesis', chars=len(text)):
+                self._synthesize_to_file(text, selected_voice, model, tmp_path, stream, stream_chunk_size, max_chars)
+            self._store_output(tmp_path, final_path, text, cache_key)
             return str(final_path)
 
         except Exception as e:
             print(f"Error generating audio: {str(e)}")
             raise
 
-    def process_text_file(self, file_path, voice_name=None, voice_id=None, upload_to_drive=True, stability=0.5, similarity_boost=0.75, style=0.0):
+    async def agenerate_audio(self, text, voice_name=None, voice_id=None, output_filename=None, output_dir=None, model="eleven_multilingual_v2", stability=0.5, similarity_boost=0.75, style=0.0, stream=False, stream_chunk_size=STREAM_CHUNK_SIZE, max_chars=None, normalized=None, force=False, exact_settings=False):
+        """Async version of generate_audio, for use inside an event loop.
+        Requests go through httpx.AsyncClient when httpx is installed and run
+        in a worker thread otherwise; disk and cache work runs in threads."""
+        import asyncio
+
+        try:
+            text, selected_voice, final_path, cache_key, cached = await asyncio.to_thread(
+                self._prepare_request,
+                text, voice_name, voice_id, output_filename, output_dir, model, stability, similarity_boost, style, normalized, force, exact_settings
+            )
+            if cached:
+                return str(final_path)
+
+            tmp_path = final_path.with_name(final_path.name + '.tmp')
+            with self.metrics.timer('synthesis', chars=len(text)):
+                await self._asynthesize_to_file(text, selected_voice, model, tmp_path, stream, stream_chunk_size, max_chars)
+            await asyncio.to_thread(self._store_output, tmp_path, final_path, text, cache_key)
+            return str(final_path)
+
+        except Exception as e:
+            print(f"Error generating audio: {str(e)}")
+            raise
+
+    def _synthesize_story(self, index, total, piece, filename, output_dir, generate_kwargs, manifest=None, fingerprint=None, on_saved=None, journal=None):
+        """Generate a single story, returning its path or None on failure.
+        With a post-processor, returns a future of that instead, so the
+        worker can move on while the audio is processed."""
+        if journal:
+            journal.mark(f"{filename}.mp3", SYNTHESIZING, fingerprint)
+        try:
+            with self.metrics.timer('story', story=filename):
+                file_path = self.generate_audio(
+                    text=piece,
+                    output_filename=filename,
+                    output_dir=output_dir,
+                    **generate_kwargs
+                )
+            if self.post_processor:
+                return self._post_process_story(index, total, filename, file_path, manifest, fingerprint, on_saved, journal)
+            self._story_saved(index, total, filename, file_path, manifest, fingerprint, journal)
+            if on_saved:
+                on_saved(file_path)
+            return file_path
+        except Exception as e:
+            return self._story_failed(index, filename, e, journal)
+
+    async def _asynthesize_story(self, index, total, piece, filename, output_dir, generate_kwargs, manifest=None, fingerprint=None, on_saved=None, journal=None):
+        """Async version of _synthesize_story"""
+        import asyncio
+
+        if journal:
+            journal.mark(f"{filename}.mp3", SYNTHESIZING, fingerprint)
+        try:
+            with self.metrics.timer('story', story=filename):
+                file_path = await self.agenerate_audio(
+                    text=piece,
+                    output_filename=filename,
+                    output_dir=output_dir,
+                    **generate_kwargs
+                )
+            if self.post_processor:
+                return self._post_process_story(index, total, filename, file_path, manifest, fingerprint, on_saved, journal)
+            self._story_saved(index, total, filename, file_path, manifest, fingerprint, journal)
+            if on_saved:
+                # Blocks while the upload queue is full
+                await asyncio.to_thread(on_saved, file_path)
+            return file_path
+        except Exception as e:
+            return self._story_failed(index, filename, e, journal)
+
+    def _post_process_story(self, index, total, filename, file_path, manifest=None, fingerprint=None, on_saved=None, journal=None):
+        """Queue a saved story for post-processing without waiting for it.
+
+        The story is recorded and handed to on_saved once processed, in the
+        thread that collects the process pool's results. Returns a future of
+        its path, or of None if processing failed."""
+        story = Future()
+
+        def processed(future):
+            try:
+                future.result()
+                self._story_saved(index, total, filename, file_path, manifest, fingerprint, journal)
+                if on_saved:
+                    on_saved(file_path)
+                story.set_result(file_path)
+            except Exception as e:
+                story.set_result(self._story_failed(index, filename, e, journal))
+
+        self.post_processor.start(file_path).add_done_callback(processed)
+        return story
+
+    def _story_saved(self, index, total, filename, file_path, manifest=None, fingerprint=None, journal=None):
+        """Record a story whose audio has been saved"""
+        if manifest:
+            manifest.record(file_path, fingerprint)
+        if journal:
+            journal.mark(file_path, SAVED)
+        print(f"Generated file {index}/{total}: {filename}")
+        self.metrics.increment('stories_generated')
+
+    def _story_failed(self, index, filename, error, journal=None):
+        """Record a story that could not be generated; returns None"""
+        print(f"Error generating audio for story {index}: {str(error)}")
+        self.metrics.increment('stories_failed')
+        if journal:
+            journal.mark(f"{filename}.mp3", FAILED)
+        return None
+
+    def _start_upload_pipeline(self, mentor_names, upload_workers):
+        """Authenticate with Drive and start uploading in the background.
+        Returns None if uploads are unavailable."""
+        print(f"\nPreparing to upload files to Google Drive...")
+        if not self.init_drive_manager():
+            print("\nSkipping Google Drive upload due to authentication failure")
+            print(f"Files are saved locally in: {self.base_dir}")
+            return None
+        try:
+            return UploadPipeline(self.drive_manager, workers=upload_workers, metrics=self.metrics).start(mentor_names)
+        except Exception as e:
+            print(f"\nError preparing Google Drive upload: {str(e)}")
+            print("Files will still be saved locally in the audio_files directory")
+            return None
+
+    @staticmethod
+    def _generate_kwargs(voice_name, voice_id, model, stability, similarity_boost, style, stream, max_chars):
+        """generate_audio settings shared by every story of a run"""
+        return {
+            'voice_name': voice_name,
+            'voice_id': voice_id,
+            'model': model,
+            'stability': stability,
+            'similarity_boost': similarity_boost,
+            'style': style,
+            'stream': stream,
+            'max_chars': max_chars
+        }
+
+    def _reset_run_stats(self):
+        """Zero the counters _print_summary reports, so it covers one run"""
+        self.retries = self.throttled = self.characters_billed = 0
+        if self.cache:
+            self.cache.reset_stats()
+        if self.post_processor:
+            self.post_processor.results.clear()
+
+    def _start_file_run(self, file_path, generate_kwargs, upload_to_drive, upload_workers, force, start_line, use_mmap, resume, bundle):
+        """Start the uploads and the run of a single text file.
+        Returns (pipeline, run, started)."""
+        # Start the upload stage first so files upload while others are synthesized
+        pipeline = None
+        if upload_to_drive:
+            pipeline = self._start_upload_pipeline([Path(file_path).stem.lower()], upload_workers)
+
+        self._reset_run_stats()
+        started = time.perf_counter()
+        try:
+            # Bundled stories are uploaded together once all are saved
+            run = self._prepare_text_file(file_path, generate_kwargs, force, None if bundle else pipeline, start_line, use_mmap, resume)
+        except Exception:
+            self._close_runs([], pipeline, started)
+            raise
+        print(f"\nProcessing {run['total']} stories...")
+        return pipeline, run, started
+
+    def _prepare_text_file(self, file_path, generate_kwargs, force=False, pipeline=None, start=1, use_mmap=False, resume=False):
+        """Set up a text file for processing without reading it into memory.
+
+        Returns the run state for the file: its output directory, manifest,
+        story count and a lazy iterator over the synthesis jobs still to do."""
+        # Verify the file exists
+        if not os.path.exists(file_path):
+            raise ValueError(f"File not found: {file_path}")
+
+        # Cheap pre-pass so progress can be reported as "n/total"
+        total = count_stories(file_path)
+        if not total:
+            raise ValueError("The input file is empty")
+
+        # Get the filename without extension to use as the base for audio files
+        file_stem = Path(file_path).stem.lower()  # Ensure lowercase
+        # Create mentor-specific directory inside audio_files
+        output_dir = self.base_dir / file_stem
+
+        run = self._open_run(file_stem, output_dir, total, pipeline, resume)
+        print(f"\n{file_stem}: {total} stories" + (f", starting at story {start}" if start > 1 else ""))
+        run['jobs'] = self._iter_jobs(run, file_path, generate_kwargs, force, pipeline, start, use_mmap, resume)
+        return run
+
+    def _open_run(self, file_stem, output_dir, total, pipeline=None, resume=False):
+        """Open the manifest and journal of an output directory and tidy it up.
+        Returns the run state, without its jobs."""
+        output_dir.mkdir(exist_ok=True, parents=True)
+        manifest = RenderManifest(output_dir)
+        journal = JobJournal(output_dir).open(resume)
+
+        # Partial writes left behind by a run that crashed mid-file
+        for leftover in output_dir.glob('*.mp3.tmp'):
+            leftover.unlink()
+
+        # Drop outputs of lines that no longer exist in the input
+        removed = manifest.remove_stale({f"{file_stem}_{index:02d}.mp3" for index in range(1, total + 1)})
+        for name in removed:
+            print(f"Removed: {output_dir / name}")
+        if pipeline and removed:
+            pipeline.delete_remote(file_stem, removed)
+
+        return {
+            'file_stem': file_stem,
+            'label': file_stem,
+            'output_dir': output_dir,
+            'manifest': manifest,
+            'journal': journal,
+            'total': total,
+            'unchanged': 0,
+            'resumed': 0,
+            'results': {}
+        }
+
+    def _iter_jobs(self, run, file_path, generate_kwargs, force, pipeline, start, use_mmap, resume=False):
+        """Lazily yield the synthesis jobs for a file's changed stories.
+        With resume, stories the journal shows as saved are not synthesized
+        again, and only those not yet uploaded are queued for upload."""
+        file_stem, journal = run['file_stem'], run['journal']
+
+        # Each saved file is queued for upload right away. The mentor folder
+        # name is the filename without extension.
+        on_saved = None
+        if pipeline:
+            def on_saved(path):
+                pipeline.submit(path, file_stem, on_uploaded=lambda uploaded: journal.mark(uploaded, UPLOADED))
+
+        for index, piece in iter_stories(file_path, start, use_mmap):
+            job = self._story_job(run, index, piece, normalizer.normalize(piece), generate_kwargs, force, on_saved, resume)
+            if job:
+                yield job
+
+    def _story_job(self, run, index, piece, normalized, generate_kwargs, force=False, on_saved=None, resume=False):
+        """Return the synthesis job for one story of a run, or None if its
+        output is already up to date"""
+        output_dir, manifest, journal = run['output_dir'], run['manifest'], run['journal']
+
+        # Format index as two digits (01, 02, etc.)
+        filename = f"{run['file_stem']}_{index:02d}"
+        # Only settings that change the rendered audio identify a story's output
+        render_settings = {key: value for key, value in generate_kwargs.items() if key != 'stream'}
+        if self.post_processor:
+            render_settings['post_processing'] = self.post_processor.settings
+        # Fingerprint the cleaned text, so whitespace-only edits don't force a re-render
+        fingerprint = manifest.fingerprint(normalized.text, render_settings)
+        output_file = output_dir / f"{filename}.mp3"
+        state = journal.state(output_file, fingerprint) if resume else None
+        if state in (SAVED, UPLOADED) and output_file.exists():
+            # Finished before the interruption; the manifest may not have been saved
+            manifest.record(output_file, fingerprint)
+            run['results'][index] = str(output_file)
+            run['resumed'] += 1
+            if state == SAVED and on_saved:
+                on_saved(output_file)
+            return None
+        if not force and manifest.is_current(output_file, fingerprint):
+            run['results'][index] = str(output_file)
+            run['unchanged'] += 1
+            # Unchanged files are skipped by the Drive sync, which
+            # also retries any that failed to upload last time
+            if on_saved:
+                on_saved(output_file)
+            return None
+        journal.mark(output_file, PENDING, fingerprint)
+        # The story is normalized once here, not again for synthesis
+        return (index, run['total'], piece, filename, output_dir, dict(generate_kwargs, normalized=normalized, force=force), manifest, fingerprint, on_saved, journal)
+
+    def _run_jobs(self, tagged_jobs, workers=1):
+        """Synthesize (tag, job) pairs, yielding (tag, job, path or None).
+
+        Results come in job order, except that post-processed stories follow
+        once they are processed. All are yielded before this returns, so
+        manifests and bundles written afterwards see processed audio."""
+        processing = deque()
+        for tag, job, result in self._synthesize_jobs(tagged_jobs, workers):
+            if isinstance(result, Future):
+                # Post-processing runs on while the workers synthesize more
+                processing.append((tag, job, result))
+            else:
+                yield tag, job, result
+            while processing and processing[0][2].done():
+                done_tag, done_job, future = processing.popleft()
+                yield done_tag, done_job, future.result()
+        for tag, job, future in processing:
+            yield tag, job, future.result()
+
+    def _synthesize_jobs(self, tagged_jobs, workers=1):
+        """Run _synthesize_story for (tag, job) pairs, yielding (tag, job, result) in job order.
+
+        Jobs are pulled from the iterable only as workers free up, so a lazy
+        job source is never read far ahead of synthesis."""
+        if not workers or workers <= 1:
+            for tag, job in tagged_jobs:
+                yield tag, job, self._synthesize_story(*job)
+            return
+
+        print(f"Using {workers} workers" + (f" (max {self.max_in_flight} requests in flight)" if self.max_in_flight else ""))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for tag, job in tagged_jobs:
+                pending.append((tag, job, executor.submit(self._synthesize_story, *job)))
+                # Bounded look-ahead; results come back in submission order,
+                # keeping output deterministic
+                if len(pending) >= workers * 2:
+                    tag, job, future = pending.popleft()
+                    yield tag, job, future.result()
+            while pending:
+                tag, job, future = pending.popleft()
+                yield tag, job, future.result()
+
+    def _close_runs(self, runs, pipeline, started):
+        """Save the runs' manifests, wait for the uploads still queued and
+        close the journals. Returns the seconds spent since started."""
+        try:
+            for run in runs:
+                run['manifest'].save()
+        finally:
+            synthesis_seconds = time.perf_counter() - started
+            if pipeline:
+                self._finish_uploads(pipeline)
+            for run in runs:
+                run['journal'].close()
+        return synthesis_seconds
+
+    @staticmethod
+    def _finish_run(run):
+        """Print a file's summary and return its output paths in story order"""
+        generated = len(run['results']) - run['unchanged'] - run['resumed']
+        resumed = f", {run['resumed']} resumed" if run['resumed'] else ""
+        print(f"{run['label']}: {generated} generated, {run['unchanged']} unchanged{resumed}, {run['total']} stories")
+        return [run['results'][index] for index in sorted(run['results'])]
+
+    def _write_bundle(self, run, pipeline=None):
+        """Pack a file's stories into <stem>.bundle and queue it for upload
+        as a single Drive file"""
+        bundle_path = run['output_dir'] / f"{run['file_stem']}{BUNDLE_SUFFIX}"
+        with self.metrics.timer('bundle'):
+            index = write_bundle(bundle_path, run['results'])
+        print(f"Bundled {len(index['stories'])} stories into {bundle_path}")
+        if pipeline:
+            pipeline.submit(bundle_path, run['file_stem'])
+
+    def _finish_uploads(self, pipeline):
+        """Barrier: wait for the uploads still in the queue and report them"""
+        uploaded_files = pipeline.close()
+        print(f"\nSuccessfully uploaded {len(uploaded_files)} files to Google Drive")
+        for file in uploaded_files:
+            print(f"Uploaded: {file['file_name']}")
+        if pipeline.errors:
+            print(f"{len(pipeline.errors)} uploads failed; files are still saved locally in {self.base_dir}")
+
+    def _print_summary(self, started, synthesis_seconds, pipeline):
+        if self.cache:
+            print(self.cache.summary())
+        if self.post_processor and self.post_processor.results:
+            print(self.post_processor.summary())
+        if self.retries or self.characters_billed:
+            print(f"API: {self.characters_billed} characters billed, {self.retries} retries ({self.throttled} throttled)")
+        total_seconds = time.perf_counter() - started
+        timing = f"Timings: synthesis {synthesis_seconds:.1f}s"
+        if pipeline:
+            upload_timings = pipeline.timings()
+            timing += f", upload {upload_timings['upload_busy']:.1f}s busy over {upload_timings['upload_span']:.1f}s"
+        print(f"{timing}, total {total_seconds:.1f}s")
+
+    def process_text_file(self, file_path, voice_name=None, voice_id=None, upload_to_drive=True, stability=0.5, similarity_boost=0.75, style=0.0, workers=1, stream=False, max_chars=None, model="eleven_multilingual_v2", force=False, upload_workers=1, start_line=1, use_mmap=False, resume=False, bundle=False):
         """Process a text file and convert each line to speech.
-        Each line represents a complete story, regardless of internal newlines."""
+        Each line represents a complete story, regardless of internal newlines.
+        With workers > 1 stories are synthesized concurrently; output names and
+        the order of the returned paths stay the same as a sequential run.
+        Stories whose text and settings match the output directory's manifest
+        are skipped unless force is set. Each file is queued for upload to
+        Google Drive as soon as it is saved, overlapping upload with synthesis.
+        The file is read lazily (optionally through mmap), so memory use does
+        not grow with its size; start_line skips the stories before it.
+        Progress is journaled, and with resume an interrupted run continues
+        where it stopped, including uploads that had not finished.
+        With bundle, the stories are also packed into one <stem>.bundle file
+        (see audio_bundle.py), which is uploaded instead of the single files."""
+        try:
+            generate_kwargs = self._generate_kwargs(voice_name, voice_id, model, stability, similarity_boost, style, stream, max_chars)
+            pipeline, run, started = self._start_file_run(file_path, generate_kwargs, upload_to_drive, upload_workers, force, start_line, use_mmap, resume, bundle)
+            try:
+                # Generate all audio files
+                for _, job, path in self._run_jobs(((None, job) for job in run['jobs']), workers):
+                    if path:
+                        run['results'][job[0]] = path
+                if bundle:
+                    self._write_bundle(run, pipeline)
+            finally:
+                synthesis_seconds = self._close_runs([run], pipeline, started)
+
+            generated_files = self._finish_run(run)
+            self._print_summary(started, synthesis_seconds, pipeline)
+            return generated_files
+
+        except Exception as e:
+            print(f"Error processing file: {str(e)}")
+            return []
+
+    def process_files(self, file_paths, voice_name=None, voice_id=None, upload_to_drive=True, stability=0.5, similarity_boost=0.75, style=0.0, workers=1, stream=False, max_chars=None, model="eleven_multilingual_v2", force=False, upload_workers=1, use_mmap=False, resume=False, bundle=False):
+        """Process many text files in one batch.
+
+        All stories from all files share one worker pool, one voice registry
+        and one Drive connection. Stories are interleaved round-robin across
+        files so every mentor makes progress at the same rate. With resume,
+        each file continues from its journal. With bundle, each file's
+        stories are packed into one bundle as in process_text_file.
+        Returns a dict of file path to its generated files."""
+        generate_kwargs = self._generate_kwargs(voice_name, voice_id, model, stability, similarity_boost, style, stream, max_chars)
+
+        pipeline = None
+        if upload_to_drive:
+            pipeline = self._start_upload_pipeline(
+                dict.fromkeys(Path(file_path).stem.lower() for file_path in file_paths),
+                upload_workers
+            )
+
+        self._reset_run_stats()
+        started = time.perf_counter()
+        runs = {}
+        try:
+            for file_path in file_paths:
+                try:
+                    runs[file_path] = self._prepare_text_file(file_path, generate_kwargs, force, None if bundle else pipeline, use_mmap=use_mmap, resume=resume)
+                except Exception as e:
+                    print(f"Error processing file {file_path}: {str(e)}")
+
+            # Fair interleaving: one story from each file in turn, pulled lazily
+            queues = [self._tag_jobs(file_path, run['jobs']) for file_path, run in runs.items()]
+            tagged_jobs = (job for round_jobs in zip_longest(*queues) for job in round_jobs if job)
+
+            print(f"\nProcessing {sum(run['total'] for run in runs.values())} stories from {len(runs)} files...")
+            for file_path, job, path in self._run_jobs(tagged_jobs, workers):
+                if path:
+                    runs[file_path]['results'][job[0]] = path
+            if bundle:
+                for run in runs.values():
+                    self._write_bundle(run, pipeline)
+        finally:
+            synthesis_seconds = self._close_runs(runs.values(), pipeline, started)
+
+        generated = {file_path: self._finish_run(run) for file_path, run in runs.items()}
+        self._print_summary(started, synthesis_seconds, pipeline)
+        return generated
+
+    def _matrix_variants(self, voice_names, stabilities, similarity_boosts, styles, model, stream, max_chars):
+        """Return {variant name: generate_audio settings} for every combination
+        of voice and settings. Voices are resolved up front, so an unknown
+        name fails before anything is synthesized."""
+        voices = []
+        for voice_name in voice_names:
+            voice = self.find_voice_by_name(voice_name)
+            if not voice:
+                raise ValueError(f"Voice '{voice_name}' not found")
+            voices.append(voice)
+
+        variants = {}
+        for voice, stability, similarity_boost, style in product(voices, stabilities, similarity_boosts, styles):
+            slug = re.sub(r'[^a-z0-9]+', '_', voice.name.lower()).strip('_') or voice.voice_id
+            variant = f"{slug}_stab{stability:g}_sim{similarity_boost:g}_style{style:g}"
+            # A variant is rendered with exactly the settings in its name,
+            # closing question or not, so the sweep compares like with like
+            variants[variant] = dict(
+                self._generate_kwargs(None, voice.voice_id, model, stability, similarity_boost, style, stream, max_chars),
+                exact_settings=True
+            )
+        return variants
+
+    def _iter_matrix_jobs(self, runs, file_path, variants, force, use_mmap, resume=False):
+        """Lazily yield (variant, job) for every story of a file in every variant.
+        Each story is read and normalized once and shared by all its variants."""
+        for index, piece in iter_stories(file_path, use_mmap=use_mmap):
+            normalized = normalizer.normalize(piece)
+            for variant, generate_kwargs in variants.items():
+                job = self._story_job(runs[variant], index, piece, normalized, generate_kwargs, force, resume=resume)
+                if job:
+                    yield variant, job
+
+    def process_matrix(self, file_path, voice_names, stabilities=(0.5,), similarity_boosts=(0.75,), styles=(0.0,), workers=1, stream=False, max_chars=None, model="eleven_multilingual_v2", force=False, use_mmap=False, resume=False):
+        """Render a text file in every combination of voices and voice settings.
+
+        Meant for auditioning voices: each variant is written to
+        audio_files/<stem>/<variant>/ with its own manifest and journal, and
+        all (story, variant) jobs share one worker pool. The file is read
+        once, whatever the number of variants. Every story is rendered with
+        its variant's settings as given, including stories ending in a
+        question. Outputs are not uploaded.
+        Returns a dict of variant name to its generated files."""
+        # Verify the file exists
+        if not os.path.exists(file_path):
+            raise ValueError(f"File not found: {file_path}")
+        total = count_stories(file_path)
+        if not total:
+            raise ValueError("The input file is empty")
+
+        variants = self._matrix_variants(voice_names, stabilities, similarity_boosts, styles, model, stream, max_chars)
+        file_stem = Path(file_path).stem.lower()
+
+        self._reset_run_stats()
+        started = time.perf_counter()
+        runs = {}
         try:
-            # Verify the file exists
-            if not os.path.exists(file_path):
-                raise ValueError(f"File not found: {file_path}")
-
-            with open(file_path, 'r', encoding='utf-8') as file:
-                # Each line in the file is a separate story
-                pieces = [line.strip() for line in file if line.strip()]
-
-            if not pieces:
-                raise ValueError("The input file is empty")
-
-            # Get the filename without extension to use as the base for audio files
-            file_stem = Path(file_path).stem.lower()  # Ensure lowercase
-            # Create mentor-specific directory inside audio_files
-            output_dir = self.base_dir / file_stem
-
-            output_dir.mkdir(exist_ok=True, parents=True)
-            generated_files = []
-
-            # Generate all audio files
-            print(f"\nProcessing {len(pieces)} stories...")
-            for index, piece in enumerate(pieces, 1):
-                if piece:  # Skip empty pieces
-                    # Format index as two digits (01, 02, etc.)
-                    filename = f"{file_stem}_{index:02d}"
-                    try:
-                        file_path = self.generate_audio(
-                            text=piece,
-                            voice_name=voice_name,
-                            voice_id=voice_id,
-                            output_filename=filename,
-                            output_dir=output_dir,
-                            stability=stability,
-                            similarity_boost=similarity_boost,
-                            style=style
-                        )
-                        generated_files.append(file_path)
-                        print(f"Generated file {index}/{len(pieces)}: {filename}")
-                    except Exception as e:
-                        print(f"Error generating audio for story {index}: {str(e)}")
-
-            # Upload to Google Drive if requested
-            if upload_to_drive and generated_files:
-                print(f"\nPreparing to upload files to Google Drive...")
-                if self.init_drive_manager():
-                    try:
-                        uploaded_files = self.drive_manager.upload_folder(
-                            str(output_dir),
-                            file_stem  # Use the filename (without extension) as the mentor folder name
-                        )
-                        print(f"Successfully uploaded {len(uploaded_files)} files to Google Drive")
-                        for file in uploaded_files:
-                            print(f"Uploaded: {file['file_name']}")
-                    except Exception as e:
-                        print(f"\nError uploading to Google Drive: {str(e)}")
-                        print("Files are still saved locally in the audio_files directory")
-                else:
-                    print("\nSkipping Google Drive upload due to authentication failure")
-                    print(f"Files are saved locally in: {output_dir}")
+            for variant in variants:
+                runs[variant] = self._open_run(file_stem, self.base_dir / file_stem / variant, total, resume=resume)
+                runs[variant]['label'] = f"{file_stem}/{variant}"
 
+            print(f"\n{file_stem}: {total} stories x {len(variants)} variants")
+            jobs = self._iter_matrix_jobs(runs, file_path, variants, force, use_mmap, resume)
+            for variant, job, path in self._run_jobs(jobs, workers):
+                if path:
+                    runs[variant]['results'][job[0]] = path
+        finally:
+            synthesis_seconds = self._close_runs(runs.values(), None, started)
+
+        generated = {variant: self._finish_run(run) for variant, run in runs.items()}
+        self._print_summary(started, synthesis_seconds, None)
+        return generated
+
+    async def aprocess_text_file(self, file_path, voice_name=None, voice_id=None, upload_to_drive=True, stability=0.5, similarity_boost=0.75, style=0.0, workers=1, stream=False, max_chars=None, model="eleven_multilingual_v2", force=False, upload_workers=1, start_line=1, use_mmap=False, resume=False, bundle=False):
+        """Async version of process_text_file, for use inside an event loop.
+        Up to `workers` stories are synthesized concurrently as tasks on the
+        running loop (hundreds are fine), while max_in_flight still caps the
+        requests sent to ElevenLabs. Reading the input, the manifest, bundling
+        and Drive uploads run in threads."""
+        import asyncio
+
+        try:
+            generate_kwargs = self._generate_kwargs(voice_name, voice_id, model, stability, similarity_boost, style, stream, max_chars)
+            pipeline, run, started = await asyncio.to_thread(
+                self._start_file_run, file_path, generate_kwargs, upload_to_drive, upload_workers, force, start_line, use_mmap, resume, bundle
+            )
+            try:
+                await self._arun_jobs(run, workers)
+                if bundle:
+                    await asyncio.to_thread(self._write_bundle, run, pipeline)
+            finally:
+                synthesis_seconds = await asyncio.to_thread(self._close_runs, [run], pipeline, started)
+
+            generated_files = self._finish_run(run)
+            self._print_summary(started, synthesis_seconds, pipeline)
             return generated_files
 
         except Exception as e:
             print(f"Error processing file: {str(e)}")
             return []
 
-    def list_voices_info(self):
+    async def _arun_jobs(self, run, workers=1):
+        """Async counterpart of _run_jobs for a single run: synthesize its
+        jobs as up to `workers` tasks, storing the paths in its results"""
+        import asyncio
+
+        slots = asyncio.Semaphore(max(1, workers))
+        tasks = set()
+
+        async def synthesize(job):
+            try:
+                path = await self._asynthesize_story(*job)
+            finally:
+                slots.release()
+            if isinstance(path, Future):
+                # The slot is already free for the next story
+                path = await asyncio.wrap_future(path)
+            if path:
+                run['results'][job[0]] = path
+
+        while True:
+            # Only pull the next story once a worker slot is free
+            await slots.acquire()
+            job = await asyncio.to_thread(next, run['jobs'], None)
+            if job is None:
+                slots.release()
+                break
+            task = asyncio.create_task(synthesize(job))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+
+    @staticmethod
+    def _tag_jobs(tag, jobs):
+        """Pair each job with a tag, e.g. the file it came from"""
+        for job in jobs:
+            yield tag, job
+
+    def list_voices_info(self, refresh=False):
         """Print detailed information about available voices"""
-        all_voices = self.list_available_voices()
+        all_voices = self.list_available_voices(refresh=refresh)
         voice_info = []
 
         for voice in all_voices:
@@ -250,39 +1194,165 @@ class ElevenLabsManager:
 
         return voice_info
 
+def expand_input_paths(paths):
+    """Expand directories (to their .txt files) and glob patterns into file paths"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, '*.txt'))))
+        elif glob.has_magic(path):
+            files.extend(sorted(glob.glob(path)))
+        else:
+            files.append(path)
+    # Drop duplicates while keeping order
+    return list(dict.fromkeys(files))
+
+def parse_float_list(value):
+    """argparse type for comma-separated numbers, e.g. 0.3,0.5,0.7"""
+    try:
+        return [float(item) for item in value.split(',') if item.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated numbers, got '{value}'")
+
 def main():
+    # Load environment variables
+    load_dotenv()
+
     parser = argparse.ArgumentParser(description='Convert text to speech using Eleven Labs API')
-    parser.add_argument('file_path', help='Path to the text file')
+    parser.add_argument('file_paths', nargs='*', metavar='file_path', help='Text files, directories of .txt files or glob patterns to process')
     parser.add_argument('--voice-name', help='Name of the voice to use')
     parser.add_argument('--voice-id', help='ID of the voice to use')
     parser.add_argument('--list-voices', action='store_true', help='List available voices')
+    parser.add_argument('--refresh-voices', action='store_true', help='Ignore the local voice cache and fetch the voice list again')
     parser.add_argument('--api-key', help='Eleven Labs API key (optional if set in .env file)')
     parser.add_argument('--no-upload', action='store_true', help='Skip uploading to Google Drive')
+    parser.add_argument('--upload-workers', type=int, default=1, help='Number of files to upload to Google Drive concurrently')
     parser.add_argument('--stability', type=float, default=0.5, help='Voice stability (0.0-1.0). Lower values = more emotional range')
     parser.add_argument('--similarity-boost', type=float, default=0.75, help='Voice similarity boost (0.0-1.0)')
     parser.add_argument('--style', type=float, default=0.0, help='Style exaggeration (0.0-1.0)')
+    parser.add_argument('--workers', type=int, default=1, help='Number of stories to synthesize concurrently')
+    parser.add_argument('--max-in-flight', type=int, help='Maximum concurrent ElevenLabs requests (defaults to --workers)')
+    parser.add_argument('--rate-limit', type=float, help='Maximum ElevenLabs requests per second')
+    parser.add_argument('--max-retries', type=int, default=5, help='Retries for throttled or failed ElevenLabs requests')
+    parser.add_argument('--http2', action='store_true', help='Use HTTP/2 for ElevenLabs requests (requires httpx[http2])')
+    parser.add_argument('--stream', action='store_true', help='Stream audio to disk as it is synthesized')
+    parser.add_argument('--max-chars', type=int, help="Split stories longer than this into parallel requests (defaults to the model's limit)")
+    parser.add_argument('--segment-workers', type=int, default=4, help='Parallel requests per story when a long story is split')
+    parser.add_argument('--start-line', type=int, default=1, help='Story number to start from (single file only)')
+    parser.add_argument('--mmap', action='store_true', help='Read input files through mmap')
+    parser.add_argument('--resume', action='store_true', help='Continue an interrupted run from its journal')
+    parser.add_argument('--bundle', action='store_true', help="Pack each file's stories into one indexed <filename>.bundle and upload only that")
+    parser.add_argument('--matrix-voices', help='Comma-separated voice names: render the file in every combination of these voices and the --matrix-* settings into audio_files/<stem>/<variant>/ (no upload)')
+    parser.add_argument('--matrix-stability', type=parse_float_list, help='Comma-separated stability values for --matrix-voices (default: --stability)')
+    parser.add_argument('--matrix-similarity-boost', type=parse_float_list, help='Comma-separated similarity boost values for --matrix-voices (default: --similarity-boost)')
+    parser.add_argument('--matrix-style', type=parse_float_list, help='Comma-separated style values for --matrix-voices (default: --style)')
+    parser.add_argument('--post-process', action='store_true', help='Trim silence and normalise loudness of each saved file (requires numpy, and ffmpeg for MP3)')
+    parser.add_argument('--post-process-workers', type=int, help='Processes for --post-process (defaults to the number of CPUs)')
+    parser.add_argument('--target-loudness', type=float, default=-20.0, help='RMS loudness target in dBFS for --post-process')
+    parser.add_argument('--silence-threshold', type=float, default=-50.0, help='Level in dBFS below which leading and trailing audio is trimmed by --post-process')
+    parser.add_argument('--force', action='store_true', help='Regenerate every story through the API, even if unchanged since the last run or in the audio cache')
+    parser.add_argument('--cache-dir', default='.tts_cache', help='Directory for the synthesized audio cache')
+    parser.add_argument('--cache-max-mb', type=int, default=1024, help='Maximum size of the audio cache in MB')
+    parser.add_argument('--no-cache', action='store_true', help='Always synthesize, bypassing the audio cache')
+    parser.add_argument('--profile', action='store_true', help='Print per-stage timings and counters at the end of the run')
+    parser.add_argument('--metrics-file', help='Write metrics to this file: a Prometheus textfile if it ends in .prom, JSON lines otherwise')
 
     args = parser.parse_args()
 
+    # Prometheus textfiles are written once at the end; JSON lines as events happen
+    prometheus_path = args.metrics_file if args.metrics_file and args.metrics_file.endswith('.prom') else None
+    metrics = Metrics(events_path=None if prometheus_path else args.metrics_file)
+
+    post_processor = None
     try:
-        manager = ElevenLabsManager(api_key=args.api_key)
+        if args.post_process:
+            if not shutil.which('ffmpeg'):
+                parser.error('--post-process needs ffmpeg on the PATH to decode and encode MP3 files')
+            # Imported here so NumPy stays optional
+            from post_processing import PostProcessor
+            post_processor = PostProcessor(
+                workers=args.post_process_workers,
+                target_dbfs=args.target_loudness,
+                silence_threshold_dbfs=args.silence_threshold,
+                metrics=metrics
+            )
+
+        manager = ElevenLabsManager(
+            api_key=args.api_key,
+            max_in_flight=args.max_in_flight or (args.workers if args.workers > 1 else None),
+            cache_dir=None if args.no_cache else args.cache_dir,
+            cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+            segment_workers=args.segment_workers,
+            requests_per_second=args.rate_limit,
+            max_retries=args.max_retries,
+            # Enough pooled connections for every worker and long-story segment
+            pool_size=max(args.max_in_flight or 0, args.workers * args.segment_workers, 10),
+            http2=args.http2,
+            metrics=metrics,
+            post_processor=post_processor
+        )
 
         if args.list_voices:
-            manager.list_voices_info()
+            manager.list_voices_info(refresh=args.refresh_voices)
             return
 
-        manager.process_text_file(
-            file_path=args.file_path,
+        if args.refresh_voices:
+            manager.list_available_voices(refresh=True)
+
+        file_paths = expand_input_paths(args.file_paths)
+        if not file_paths:
+            parser.error('at least one file_path is required')
+
+        options = dict(
             voice_name=args.voice_name,
             voice_id=args.voice_id,
             upload_to_drive=not args.no_upload,
             stability=args.stability,
             similarity_boost=args.similarity_boost,
-            style=args.style
+            style=args.style,
+            workers=args.workers,
+            stream=args.stream,
+            max_chars=args.max_chars,
+            force=args.force,
+            upload_workers=args.upload_workers,
+            use_mmap=args.mmap,
+            resume=args.resume,
+            bundle=args.bundle
         )
+        if args.matrix_voices:
+            if len(file_paths) > 1:
+                parser.error('--matrix-voices takes a single file_path')
+            # Every voice and settings combination in one parallel run
+            manager.process_matrix(
+                file_paths[0],
+                [name.strip() for name in args.matrix_voices.split(',') if name.strip()],
+                stabilities=args.matrix_stability or [args.stability],
+                similarity_boosts=args.matrix_similarity_boost or [args.similarity_boost],
+                styles=args.matrix_style or [args.style],
+                workers=args.workers,
+                stream=args.stream,
+                max_chars=args.max_chars,
+                force=args.force,
+                use_mmap=args.mmap,
+                resume=args.resume
+            )
+        elif len(file_paths) == 1:
+            manager.process_text_file(file_path=file_paths[0], start_line=args.start_line, **options)
+        else:
+            # One shared pool, voice registry and Drive connection for all files
+            manager.process_files(file_paths, **options)
+
+        if args.profile:
+            print(f"\nProfile:\n{metrics.summary()}")
+        if prometheus_path:
+            metrics.write_prometheus(prometheus_path)
 
     except Exception as e:
         print(f"Error: {str(e)}")
+    finally:
+        if post_processor:
+            post_processor.close()
+        metrics.close()
 
 if __name__ == "__main__":
     main()
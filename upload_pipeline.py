@@ -0,0 +1,163 @@
+import queue
+import threading
+import time
+from pathlib import Path
+
+from metrics import Metrics
+
+# Sentinel telling an upload worker to stop
+_DONE = object()
+
+
+class UploadPipeline:
+    """Upload files to mentors' Drive folders while synthesis continues.
+
+    Files are submitted as soon as they are saved and uploaded by
+    background workers. The queue is bounded, so synthesis blocks when
+    uploads fall behind instead of buffering an unbounded backlog."""
+
+    def __init__(self, drive_manager, workers=1, queue_size=16, sync=True, metrics=None):
+        self.drive_manager = drive_manager
+        self.metrics = metrics or Metrics()
+        self.workers = max(1, workers)
+        self.sync = sync
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.uploaded_files = []
+        self.errors = []
+        self.upload_seconds = 0.0
+        self.folder_ids = {}
+        self._remote_files = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._threads = []
+        self._started_at = None
+        self._last_upload_at = None
+
+    def start(self, mentor_names):
+        """Resolve the mentors' Drive folders and start the upload workers"""
+        self._started_at = time.perf_counter()
+        mentor_names = list(mentor_names)
+        with self.metrics.timer('folder_lookup'):
+            self.folder_ids = self._resolve_folders(mentor_names)
+            # Cached IDs go stale when a folder is deleted or trashed in Drive;
+            # one batched check per run, instead of failing every upload
+            if self.drive_manager.stale_folders(self.folder_ids.values()):
+                print("Cached Drive folders were deleted or trashed, looking them up again...")
+                self.drive_manager.clear_folder_cache()
+                self.folder_ids = self._resolve_folders(mentor_names)
+
+        if self.sync:
+            listing_started = time.perf_counter()
+            if len(self.folder_ids) == 1:
+                listings = {folder_id: self.drive_manager.list_folder(folder_id) for folder_id in self.folder_ids.values()}
+            else:
+                listings = self.drive_manager.list_folders(self.folder_ids.values())
+            for mentor_name, folder_id in self.folder_ids.items():
+                remote_files = {}
+                for remote in listings.get(folder_id, []):
+                    remote_files.setdefault(remote['name'], remote)
+                self._remote_files[mentor_name] = remote_files
+            self.metrics.observe('folder_listing', time.perf_counter() - listing_started)
+
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._worker, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _resolve_folders(self, mentor_names):
+        """Return {mentor name: Drive folder ID}, creating missing folders"""
+        if len(mentor_names) == 1:
+            return {mentor_names[0]: self.drive_manager.ensure_mentor_folder(mentor_names[0])}
+        # Provision all folders with a handful of batched requests
+        return self.drive_manager.ensure_mentor_folders(mentor_names)
+
+    def _refresh_folder(self, mentor_name, stale_id):
+        """Look a mentor's folder up again after Drive reported its ID missing.
+        Workers that hit the same stale ID only refresh it once."""
+        with self._refresh_lock:
+            if self.folder_ids.get(mentor_name) != stale_id:
+                return
+            print(f"Drive folder for {mentor_name} not found, looking it up again...")
+            self.drive_manager.clear_folder_cache()
+            folder_id = self.drive_manager.ensure_mentor_folder(mentor_name)
+            remote_files = {}
+            if self.sync:
+                for remote in self.drive_manager.list_folder(folder_id):
+                    remote_files.setdefault(remote['name'], remote)
+            self._remote_files[mentor_name] = remote_files
+            self.folder_ids[mentor_name] = folder_id
+
+    def _upload(self, file_path, mentor_name, retry_stale_folder=True):
+        """Sync one file to its mentor's folder; returns it if transferred"""
+        folder_id = self.folder_ids[mentor_name]
+        remote = self._remote_files.get(mentor_name, {}).get(file_path.name)
+        try:
+            return self.drive_manager.sync_file(file_path, folder_id, remote)
+        except Exception as e:
+            # googleapiclient is not imported here, so check the HttpError's status duck-typed
+            if not retry_stale_folder or getattr(getattr(e, 'resp', None), 'status', None) != 404:
+                raise
+        # The folder, or the file being updated, was deleted in Drive mid-run
+        self._refresh_folder(mentor_name, folder_id)
+        return self._upload(file_path, mentor_name, retry_stale_folder=False)
+
+    def delete_remote(self, mentor_name, file_names):
+        """Delete files from a mentor's Drive folder, e.g. outputs of removed lines"""
+        remote_files = self._remote_files.get(mentor_name, {})
+        file_ids = [remote_files[name]['id'] for name in file_names if name in remote_files]
+        if not file_ids:
+            return
+        failed = self.drive_manager.delete_files(file_ids)
+        print(f"Deleted {len(file_ids) - len(failed)} removed files from Google Drive")
+
+    def submit(self, file_path, mentor_name, on_uploaded=None):
+        """Queue a saved file for upload, blocking while the queue is full.
+        on_uploaded(file_path) is called once the file is on Drive."""
+        # Time blocked here is time synthesis waits on uploads
+        with self.metrics.timer('upload_queue_wait'):
+            self.queue.put((Path(file_path), mentor_name, on_uploaded))
+
+    def _worker(self):
+        while True:
+            item = self.queue.get()
+            if item is _DONE:
+                return
+            file_path, mentor_name, on_uploaded = item
+            start = time.perf_counter()
+            try:
+                result = self._upload(file_path, mentor_name)
+                if result:
+                    result['mentor'] = mentor_name
+                    with self._lock:
+                        self.uploaded_files.append(result)
+                    self.metrics.increment('bytes_uploaded', file_path.stat().st_size)
+                if on_uploaded:
+                    on_uploaded(file_path)
+            except Exception as e:
+                print(f"Error uploading {file_path.name}: {str(e)}")
+                self.metrics.increment('upload_errors')
+                with self._lock:
+                    self.errors.append((file_path.name, str(e)))
+            finally:
+                now = time.perf_counter()
+                self.metrics.observe('upload', now - start, file=file_path.name)
+                with self._lock:
+                    self.upload_seconds += now - start
+                    self._last_upload_at = now
+
+    def close(self):
+        """Wait for all queued uploads to finish and return the uploaded files"""
+        for _ in self._threads:
+            self.queue.put(_DONE)
+        for thread in self._threads:
+            thread.join()
+        return self.uploaded_files
+
+    def timings(self):
+        """Return upload stage timings in seconds"""
+        end = self._last_upload_at or self._started_at
+        return {
+            'upload_busy': self.upload_seconds,
+            'upload_span': (end - self._started_at) if self._started_at else 0.0
+        }
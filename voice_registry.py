@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+VoiceInfo = namedtuple('VoiceInfo', ['name', 'voice_id', 'category', 'description'])
+
+
+class VoiceRegistry:
+    """Process-wide view of the ElevenLabs voice catalogue.
+
+    The catalogue is fetched at most once per process and persisted to a
+    local JSON file so later runs within the TTL skip the API entirely."""
+
+    def __init__(self, fetch_voices, cache_path='.voices_cache.json', ttl=24 * 60 * 60, api_key=None):
+        self.fetch_voices = fetch_voices
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.ttl = ttl
+        # Voice catalogues differ between accounts, so tie the cache to the key
+        self.account = hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16] if api_key else None
+        self._voices = None
+        self._by_name = {}
+        self._lock = threading.Lock()
+
+    def _load_cache(self):
+        """Return cached voices if the cache file is fresh and for this account"""
+        if not self.cache_path or not self.cache_path.exists():
+            return None
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('account') != self.account:
+            return None
+        if time.time() - data.get('fetched_at', 0) > self.ttl:
+            return None
+        return [VoiceInfo(**voice) for voice in data.get('voices', [])]
+
+    def _save_cache(self, voices):
+        """Persist the catalogue for later runs"""
+        if not self.cache_path:
+            return
+        data = {
+            'account': self.account,
+            'fetched_at': time.time(),
+            'voices': [voice._asdict() for voice in voices]
+        }
+        tmp_path = self.cache_path.with_name(self.cache_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.cache_path)
+
+    def _set_voices(self, voices):
+        # setdefault keeps the first voice when names collide, as a linear scan would
+        by_name = {}
+        for voice in voices:
+            by_name.setdefault(voice.name.lower(), voice)
+        self._by_name = by_name
+        self._voices = voices
+
+    def _fetch(self):
+        """Fetch the catalogue from the API (caller holds the lock)"""
+        voices = [
+            VoiceInfo(
+                name=voice.name,
+                voice_id=voice.voice_id,
+                category=getattr(voice, 'category', None),
+                description=getattr(voice, 'description', None)
+            )
+            for voice in self.fetch_voices()
+        ]
+        self._set_voices(voices)
+        self._save_cache(voices)
+        return voices
+
+    def refresh(self):
+        """Fetch the catalogue from the API and update the local cache"""
+        with self._lock:
+            return self._fetch()
+
+    def voices(self):
+        """Return all voices, fetching them only on first use"""
+        if self._voices is None:
+            with self._lock:
+                # Re-check under the lock so concurrent workers share one fetch
+                if self._voices is None:
+                    cached = self._load_cache()
+                    if cached is not None:
+                        self._set_voices(cached)
+                    else:
+                        self._fetch()
+        return self._voices
+
+    def find(self, voice_name):
+        """Find a voice by name, ignoring case"""
+        self.voices()
+        return self._by_name.get(voice_name.lower())